@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
@@ -44,3 +46,19 @@ with open(filename, 'r', errors='ignore') as f:
     assert file != default_md, (
         f'Не забудьте оформить `{filename}.`'
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    from api.authentication import token_user_cache
+    from api.filters import group_slug_cache, username_cache
+    from api.groups import group_cache
+
+    for cache in caches.all():
+        cache.clear()
+    token_user_cache.clear()
+    group_slug_cache.clear()
+    username_cache.clear()
+    group_cache.clear()
@@ -0,0 +1,128 @@
+import asyncio
+from http import HTTPStatus
+from io import StringIO
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.test import AsyncRequestFactory
+from django.urls import resolve
+import pytest
+
+from api.async_views import async_read_urls, async_read_view
+from api.urls import router_v1
+from posts.models import Post, User
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadPath:
+
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def sync_calls(self):
+        return []
+
+    @pytest.fixture
+    def async_view(self, sync_calls):
+        view = resolve(self.post_list_url).func
+
+        def spy(request, *args, **kwargs):
+            sync_calls.append(request.method)
+            return view(request, *args, **kwargs)
+
+        spy.cls = view.cls
+        spy.initkwargs = view.initkwargs
+        spy.actions = view.actions
+        return async_read_view(spy)
+
+    def call(self, async_view, method='get', **extra):
+        request = getattr(AsyncRequestFactory(), method)(
+            self.post_list_url, **extra)
+        response = async_to_sync(async_view)(request)
+        if hasattr(response, 'render'):
+            # Ответ синхронного представления отрисовывает обработчик
+            # запросов Django.
+            response.render()
+        return response
+
+    def test_cache_hit_served_without_sync_view(
+            self, async_view, sync_calls, post,
+            django_assert_num_queries):
+        first = self.call(async_view)
+        assert first.status_code == HTTPStatus.OK
+        assert sync_calls == ['GET'], (
+            'Проверьте, что при промахе кэша запрос выполняется синхронным '
+            'представлением.'
+        )
+
+        with django_assert_num_queries(0):
+            second = self.call(async_view)
+        assert sync_calls == ['GET'], (
+            'Проверьте, что закэшированный ответ отдаётся асинхронным '
+            'представлением без перехода в пул потоков.'
+        )
+        assert json.loads(second.content) == json.loads(first.content)
+        assert second['ETag'] == first['ETag']
+
+        not_modified = self.call(
+            async_view, **{'if-none-match': first['ETag']})
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert sync_calls == ['GET']
+
+    def test_generation_read_off_event_loop(self, async_view, post,
+                                            monkeypatch):
+        self.call(async_view)
+        reads_on_loop = []
+        get = FileBasedCache.get
+
+        def spy(cache, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                reads_on_loop.append(args)
+            return get(cache, *args, **kwargs)
+
+        monkeypatch.setattr(FileBasedCache, 'get', spy)
+        assert self.call(async_view).status_code == HTTPStatus.OK
+        assert reads_on_loop == [], (
+            'Проверьте, что асинхронное представление читает поколение из '
+            'файлового кэша вне цикла событий.'
+        )
+
+    def test_write_uses_sync_view(self, async_view, sync_calls):
+        response = self.call(async_view, method='post')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert sync_calls == ['POST']
+
+    def test_async_read_urls(self):
+        views = {
+            pattern.callback.cls.__name__:
+                asyncio.iscoroutinefunction(pattern.callback)
+            for pattern in async_read_urls(router_v1.urls)
+            if hasattr(pattern.callback, 'cls')
+        }
+        assert views['PostViewSet'] and views['CommentViewSet'] and (
+            views['GroupViewSet']), (
+            'Проверьте, что представления постов, комментариев и сообществ '
+            'заменяются асинхронными.'
+        )
+        assert not views['FollowViewSet']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_async_command():
+    stdout = StringIO()
+    call_command('benchmark_async', posts=5, requests=40, concurrency=4,
+                 stdout=stdout)
+    output = stdout.getvalue()
+    assert 'WSGI' in output and 'ASGI' in output, (
+        'Проверьте, что команда `benchmark_async` сравнивает синхронный и '
+        'асинхронный путь чтения.'
+    )
+    assert not Post.objects.exists() and not User.objects.exists(), (
+        'Проверьте, что команда `benchmark_async` удаляет созданные данные.'
+    )
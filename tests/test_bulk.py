@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreateAPI:
+
+    posts_bulk_url = '/api/v1/posts/bulk/'
+    comments_bulk_url = '/api/v1/posts/{post_id}/comments/bulk/'
+
+    def test_bulk_create_not_auth(self, client):
+        response = client.post(self.posts_bulk_url,
+                               data=[{'text': 'Пост'}],
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.posts_bulk_url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_posts_bulk_create_reports_item_errors(self, user_client, user,
+                                                   group_1):
+        data = [
+            {'text': 'Пост 1', 'group': group_1.id},
+            {'group': group_1.id},
+            {'text': 'Пост 3'},
+        ]
+        response = user_client.post(self.posts_bulk_url, data=data,
+                                    format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.posts_bulk_url}` с частью '
+            'валидных элементов возвращает ответ со статусом 201.'
+        )
+        test_data = response.json()
+        assert [post['text'] for post in test_data['results']] == [
+            'Пост 1', 'Пост 3'
+        ], (
+            f'Проверьте, что POST-запрос к `{self.posts_bulk_url}` создаёт '
+            'валидные элементы и возвращает их в ответе.'
+        )
+        assert all(post['author'] == user.username and post['id']
+                   for post in test_data['results'])
+        assert [error['index'] for error in test_data['errors']] == [1], (
+            f'Проверьте, что POST-запрос к `{self.posts_bulk_url}` '
+            'возвращает ошибки с индексами невалидных элементов.'
+        )
+        assert Post.objects.filter(author=user).count() == 2
+
+    def test_posts_bulk_create_atomic(self, user_client):
+        data = [{'text': 'Пост 1'}, {}]
+        response = user_client.post(f'{self.posts_bulk_url}?atomic=1',
+                                    data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что в атомарном режиме ошибка любого элемента '
+            'возвращает ответ со статусом 400.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что в атомарном режиме ошибка любого элемента '
+            'отменяет создание всего пакета.'
+        )
+
+    def test_comments_bulk_create(self, user_client, post):
+        data = [{'text': 'Коммент 1'}, {'text': 'Коммент 2'}]
+        response = user_client.post(
+            self.comments_bulk_url.format(post_id=post.id),
+            data=data, format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос к `/api/v1/posts/{post_id}/comments/'
+            'bulk/` возвращает ответ со статусом 201.'
+        )
+        assert Comment.objects.filter(post=post).count() == 2, (
+            'Проверьте, что пакетное создание комментариев привязывает их '
+            'к посту из URL.'
+        )
+
+    def test_posts_bulk_delete_only_own(self, user_client, post, post_2,
+                                        another_post):
+        response = user_client.post(
+            '/api/v1/posts/bulk-delete/',
+            data={'ids': [post.id, another_post.id]}, format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 1}, (
+            'Проверьте, что пакетное удаление удаляет только посты '
+            'пользователя.'
+        )
+        assert set(Post.objects.values_list('id', flat=True)) == {
+            post_2.id, another_post.id
+        }
+
+    @pytest.mark.parametrize('ids', ('all', [True], [2 ** 70], [0]))
+    def test_posts_bulk_delete_invalid_data(self, user_client, post, ids):
+        response = user_client.post('/api/v1/posts/bulk-delete/',
+                                    data={'ids': ids}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакетное удаление принимает только список '
+            'положительных идентификаторов в диапазоне `BigAutoField`.'
+        )
+        assert Post.objects.filter(id=post.id).exists()
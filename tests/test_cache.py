@@ -0,0 +1,228 @@
+from django.db import transaction
+import pytest
+
+from api.cache import (LRUMemoryCache, check_generation_cache,
+                       get_api_cache, get_cache_stats, reset_cache_stats)
+from posts.models import Comment, Group, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    group_url = '/api/v1/groups/'
+
+    def test_cache_hit_skips_database(self, client, post,
+                                      django_assert_num_queries):
+        reset_cache_stats()
+        first = client.get(self.post_list_url)
+        with django_assert_num_queries(0):
+            second = client.get(self.post_list_url)
+        assert first.json() == second.json(), (
+            'Проверьте, что закэшированный ответ совпадает с исходным.'
+        )
+        stats = get_cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1), (
+            'Проверьте подсчёт попаданий и промахов кэша ответов.'
+        )
+
+    def test_cache_invalidated_by_post_signals(self, client, user, post):
+        client.get(self.post_list_url)
+        client.get(self.post_detail_url.format(post_id=post.id))
+
+        new_post = Post.objects.create(text='Новый пост', author=user)
+        assert len(client.get(self.post_list_url).json()) == 2, (
+            'Проверьте, что создание поста сбрасывает кэш списка постов.'
+        )
+
+        post.text = 'Изменённый текст'
+        post.save()
+        response = client.get(self.post_detail_url.format(post_id=post.id))
+        assert response.json()['text'] == post.text, (
+            'Проверьте, что изменение поста сбрасывает кэш поста.'
+        )
+
+        new_post.delete()
+        assert len(client.get(self.post_list_url).json()) == 1, (
+            'Проверьте, что удаление поста сбрасывает кэш списка постов.'
+        )
+
+    def test_cache_invalidated_by_comment_and_group_signals(
+            self, client, user, post, group_1):
+        url = self.comments_url.format(post_id=post.id)
+        client.get(url)
+        Comment.objects.create(author=user, post=post, text='Коммент')
+        assert len(client.get(url).json()) == 1, (
+            'Проверьте, что создание комментария сбрасывает кэш '
+            'комментариев поста.'
+        )
+
+        client.get(self.group_url)
+        Group.objects.create(title='Группа 3', slug='group_3')
+        assert len(client.get(self.group_url).json()) == 2, (
+            'Проверьте, что создание группы сбрасывает кэш групп.'
+        )
+
+    def test_cache_invalidated_by_username_change(self, client, user, post,
+                                                  another_post):
+        Comment.objects.create(author=user, post=another_post, text='Текст')
+        urls = (self.post_list_url,
+                self.post_detail_url.format(post_id=post.id),
+                self.comments_url.format(post_id=another_post.id))
+        for url in urls:
+            client.get(url)
+
+        user.username = 'RenamedUser'
+        user.save()
+        response = client.get(self.post_list_url)
+        assert user.username in [item['author'] for item in response.json()], (
+            'Проверьте, что смена имени пользователя сбрасывает кэш списка '
+            'постов.'
+        )
+        response = client.get(urls[1])
+        assert response.json()['author'] == user.username, (
+            'Проверьте, что смена имени пользователя сбрасывает кэш его '
+            'постов.'
+        )
+        response = client.get(urls[2])
+        assert response.json()[0]['author'] == user.username, (
+            'Проверьте, что смена имени пользователя сбрасывает кэш '
+            'комментариев постов, которые он комментировал.'
+        )
+
+    def test_cache_key_depends_on_visibility(self, client, user_client,
+                                             post):
+        reset_cache_stats()
+        client.get(self.post_list_url)
+        user_client.get(self.post_list_url)
+        assert get_cache_stats()['misses'] == 2, (
+            'Проверьте, что анонимные и аутентифицированные запросы '
+            'кэшируются отдельно.'
+        )
+
+
+class TestLRUMemoryCache:
+
+    def test_lru_evicts_by_size(self):
+        cache = LRUMemoryCache('test-lru', {'OPTIONS': {'MAX_BYTES': 1000}})
+        cache.clear()
+        reset_cache_stats()
+        cache.set('a', 'x' * 400)
+        cache.set('b', 'x' * 400)
+        cache.get('a')
+        cache.set('c', 'x' * 400)
+        assert cache.get('b') is None and cache.get('a') is not None, (
+            'Проверьте, что при переполнении вытесняется давно не '
+            'использованная запись.'
+        )
+        assert cache.size <= 1000, (
+            'Проверьте, что суммарный размер записей не превышает '
+            '`MAX_BYTES`.'
+        )
+        assert get_cache_stats()['evictions'] == 1
+
+        cache.set('huge', 'x' * 2000)
+        assert cache.get('huge') is None, (
+            'Проверьте, что запись больше `MAX_BYTES` не сохраняется.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    group_detail_url = '/api/v1/groups/{group_id}/'
+
+    @pytest.mark.parametrize('url_name', (
+        'post_list_url', 'comments_url', 'group_detail_url'
+    ))
+    def test_if_none_match_returns_not_modified(
+            self, client, post, group_1, url_name,
+            django_assert_num_queries):
+        url = getattr(self, url_name).format(
+            post_id=post.id, group_id=group_1.id)
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+    def test_if_modified_since_returns_not_modified(self, client, post):
+        response = client.get(self.post_list_url)
+        response = client.get(
+            self.post_list_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что GET-запрос с актуальным `If-Modified-Since` '
+            'возвращает ответ со статусом 304.'
+        )
+
+    def test_etag_changes_after_write(self, client, user, post):
+        etag = client.get(self.post_list_url)['ETag']
+        Post.objects.create(text='Новый пост', author=user)
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что после создания поста `ETag` списка постов '
+            'меняется и возвращается актуальный список.'
+        )
+
+    def test_last_modified_increases_within_second(self, client, user,
+                                                   post):
+        last_modified = client.get(self.post_list_url)['Last-Modified']
+        Post.objects.create(text='Новый пост', author=user)
+        response = client.get(self.post_list_url,
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200, (
+            'Проверьте, что `Last-Modified` растёт с каждым изменением, '
+            'даже если изменения сделаны в одну секунду.'
+        )
+
+    def test_read_during_write_transaction_not_reused(self, client, user,
+                                                      post):
+        with transaction.atomic():
+            Post.objects.create(text='Новый пост', author=user)
+            # Запрос внутри незафиксированной транзакции: конкурентный
+            # запрос с тем же поколением прочитал бы старые строки.
+            etag = client.get(self.post_list_url)['ETag']
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and len(response.json()) == 2, (
+            'Проверьте, что поколение кэша меняется после фиксации '
+            'транзакции и ответ, закэшированный до фиксации, не отдаётся.'
+        )
+
+    def test_etag_not_kept_in_process_memory(self, client, post):
+        etag = client.get(self.post_list_url)['ETag']
+        # Другой процесс не видит кэш ответов этого процесса.
+        get_api_cache().clear()
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что поколения для `ETag` хранятся в общем для '
+            'процессов кэше `API_GENERATION_CACHE_ALIAS`, а не в кэше '
+            'ответов.'
+        )
+
+    def test_process_local_generation_cache_warned(self, settings):
+        assert check_generation_cache(None) == []
+        settings.CACHES = {
+            **settings.CACHES,
+            'api-generations': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        assert [error.id for error in check_generation_cache(None)] == [
+            'api.W001'
+        ], (
+            'Проверьте, что кэш поколений в памяти процесса вызывает '
+            'предупреждение проверки `api.W001`.'
+        )
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from posts.models import Post, Profile
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    post_list_url = '/api/v1/posts/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    user_url = '/api/v1/users/{username}/'
+
+    def test_comments_count(self, user_client, post, comment_1_post):
+        url = self.comments_url.format(post_id=post.id)
+        user_client.post(url, data={'text': 'Новый комментарий'})
+        response = user_client.get(f'{self.post_list_url}{post.id}/')
+        assert response.json()['comments_count'] == 2, (
+            'Проверьте, что ответ с постом содержит поле `comments_count`, '
+            'которое учитывает новые комментарии.'
+        )
+
+        user_client.delete(f'{url}{comment_1_post.id}/')
+        response = user_client.get(f'{self.post_list_url}{post.id}/')
+        assert response.json()['comments_count'] == 1, (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+
+    def test_post_update_keeps_comments_count(self, user_client, post,
+                                              comment_1_post):
+        user_client.patch(f'{self.post_list_url}{post.id}/',
+                          data={'text': 'Изменённый пост'})
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что изменение поста не перезаписывает счётчик '
+            'комментариев.'
+        )
+
+    def test_profile_counts(self, user_client, user, post, post_2,
+                            follow_1, follow_2, another_user):
+        response = user_client.get(
+            self.user_url.format(username=user.username))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/users/{username}/` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.json() == {
+            'username': user.username,
+            'posts_count': 2,
+            'followers_count': 1,
+            'following_count': 1,
+        }, (
+            'Проверьте, что ответ с пользователем содержит счётчики постов, '
+            'подписчиков и подписок.'
+        )
+
+        user_client.delete(f'{self.post_list_url}{post.id}/')
+        another_user.following.all().delete()
+        profile = Profile.objects.get(user=user)
+        assert (profile.posts_count, profile.following_count) == (1, 1)
+        assert Profile.objects.get(user=another_user).followers_count == 1
+
+    def test_reconcile_counters(self, user, post, comment_1_post, follow_1,
+                                another_user):
+        Post.objects.update(comments_count=10)
+        Profile.objects.filter(user=user).update(posts_count=0)
+        Profile.objects.filter(user=another_user).delete()
+
+        call_command('reconcile_counters', batch_size=1, stdout=StringIO())
+
+        assert Post.objects.get(id=post.id).comments_count == 1, (
+            'Проверьте, что команда `reconcile_counters` исправляет '
+            '`Post.comments_count`.'
+        )
+        assert Profile.objects.get(user=user).posts_count == 1
+        assert Profile.objects.get(user=another_user).followers_count == 1, (
+            'Проверьте, что команда `reconcile_counters` создаёт '
+            'недостающие профили.'
+        )
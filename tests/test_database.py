@@ -0,0 +1,306 @@
+from io import StringIO
+import sqlite3
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import RequestFactory
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.backends.pool import (ConnectionPool, PoolTimeout, close_pools,
+                               pool_stats)
+from api.routers import (ReadWriteRouter, check_sticky_cache,
+                         safe_method_read_middleware)
+from posts.models import Post
+
+
+class TestSQLiteProfile:
+
+    @pytest.fixture
+    def handler(self, tmp_path, django_db_blocker):
+        name = tmp_path / 'db.sqlite3'
+        handler = ConnectionHandler({
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': name,
+                'PRAGMAS': {'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+                            'busy_timeout': 5000},
+            },
+            'reader': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': f'file:{name}?mode=ro',
+                'OPTIONS': {'uri': True},
+                'PRAGMAS': {'query_only': 'ON'},
+            },
+        })
+        # Подключения к временному файлу не затрагивают тестовую БД.
+        with django_db_blocker.unblock():
+            yield handler
+            handler.close_all()
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self, handler):
+        connection = handler['default']
+        assert self.pragma(connection, 'journal_mode') == 'wal', (
+            'Проверьте, что при открытии подключения применяются настройки '
+            'из ключа `PRAGMAS`.'
+        )
+        assert self.pragma(connection, 'synchronous') == 1
+        assert self.pragma(connection, 'busy_timeout') == 5000
+
+    def test_reader_is_read_only(self, handler):
+        with handler['default'].cursor() as cursor:
+            cursor.execute('CREATE TABLE test (value INTEGER)')
+        with pytest.raises(OperationalError):
+            with handler['reader'].cursor() as cursor:
+                cursor.execute('INSERT INTO test VALUES (1)')
+
+    def test_benchmark_sqlite_command(self, django_db_blocker):
+        stdout = StringIO()
+        # Команда работает с временными файлами, а не с тестовой БД.
+        with django_db_blocker.unblock():
+            call_command('benchmark_sqlite', writers=2, readers=2,
+                         duration=0.2, posts=10, stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        assert [line.split(':')[0] for line in lines[1:]] == [
+            'По умолчанию', 'Производственный профиль'
+        ], (
+            'Проверьте, что команда `benchmark_sqlite` сравнивает настройки '
+            'SQLite по умолчанию с производственным профилем.'
+        )
+        assert all('записей 0/с' not in line and 'чтений 0/с' not in line
+                   for line in lines), (
+            'Проверьте, что команда `benchmark_sqlite` выполняет запись и '
+            'чтение в обоих профилях.'
+        )
+
+
+class TestReadWriteRouter:
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = ['reader']
+        settings.DATABASE_STICKY_SECONDS = 5
+
+    def auth(self, user_id):
+        token = AccessToken()
+        token['user_id'] = user_id
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    @pytest.mark.parametrize('method, alias', (
+        ('get', 'reader'),
+        ('post', 'default'),
+    ))
+    def test_safe_requests_read_from_reader(self, method, alias):
+        router = ReadWriteRouter()
+        middleware = safe_method_read_middleware(
+            lambda request: router.db_for_read(Post))
+
+        request = getattr(RequestFactory(), method)('/api/v1/posts/')
+        assert middleware(request) == alias, (
+            'Проверьте, что чтение безопасных запросов направляется в '
+            'подключение `reader`, а остальных — в `default`.'
+        )
+        assert router.db_for_read(Post) == 'default'
+        assert router.db_for_write(Post) == 'default'
+
+    def test_reads_follow_writes(self, tmp_path, django_db_blocker):
+        handler = ConnectionHandler({
+            alias: {'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': tmp_path / f'{alias}.sqlite3'}
+            for alias in ('default', 'reader')
+        })
+        router = ReadWriteRouter()
+
+        def view(request):
+            if request.method == 'POST':
+                with handler[router.db_for_write(Post)].cursor() as cursor:
+                    cursor.execute("UPDATE test SET value = 'new'")
+            with handler[router.db_for_read(Post)].cursor() as cursor:
+                cursor.execute('SELECT value FROM test')
+                return cursor.fetchone()[0]
+
+        middleware = safe_method_read_middleware(view)
+        factory = RequestFactory()
+        with django_db_blocker.unblock():
+            # Реплика ещё не получила изменения основной БД.
+            for alias in ('default', 'reader'):
+                with handler[alias].cursor() as cursor:
+                    cursor.execute('CREATE TABLE test (value TEXT)')
+                    cursor.execute("INSERT INTO test VALUES ('old')")
+            try:
+                assert middleware(factory.get('/', **self.auth(1))) == 'old'
+                assert middleware(factory.post('/', **self.auth(1))) == 'new'
+                assert middleware(factory.get('/', **self.auth(1))) == 'new', (
+                    'Проверьте, что после записи чтение пользователя идёт '
+                    'в основную БД `DATABASE_STICKY_SECONDS` секунд.'
+                )
+                assert middleware(factory.get('/', **self.auth(2))) == 'old'
+                assert middleware(factory.get('/')) == 'old'
+            finally:
+                handler.close_all()
+
+    def test_sticky_window_expires(self, settings):
+        settings.DATABASE_STICKY_SECONDS = 0.05
+        router = ReadWriteRouter()
+        factory = RequestFactory()
+        write = safe_method_read_middleware(
+            lambda request: router.db_for_write(Post))
+        read = safe_method_read_middleware(
+            lambda request: router.db_for_read(Post))
+
+        write(factory.delete('/', **self.auth(1)))
+        assert read(factory.get('/', **self.auth(1))) == 'default'
+        time.sleep(0.1)
+        assert read(factory.get('/', **self.auth(1))) == 'reader', (
+            'Проверьте, что по истечении `DATABASE_STICKY_SECONDS` чтение '
+            'снова идёт в реплику.'
+        )
+
+    def test_sticky_marker_in_shared_cache(self):
+        router = ReadWriteRouter()
+        factory = RequestFactory()
+        write = safe_method_read_middleware(
+            lambda request: router.db_for_write(Post))
+        read = safe_method_read_middleware(
+            lambda request: router.db_for_read(Post))
+
+        write(factory.delete('/', **self.auth(1)))
+        # Другой процесс не видит кэш `default` этого процесса.
+        caches['default'].clear()
+        assert read(factory.get('/', **self.auth(1))) == 'default', (
+            'Проверьте, что отметки записи хранятся в общем для процессов '
+            'кэше `DATABASE_STICKY_CACHE_ALIAS`.'
+        )
+
+    def test_process_local_sticky_cache_warned(self, settings):
+        assert check_sticky_cache(None) == []
+        settings.CACHES = {
+            **settings.CACHES,
+            'api-generations': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        assert [error.id for error in check_sticky_cache(None)] == [
+            'api.W002'
+        ], (
+            'Проверьте, что кэш отметок записи в памяти процесса вызывает '
+            'предупреждение проверки `api.W002`.'
+        )
+
+
+class TestConnectionPool:
+
+    def connect(self):
+        return sqlite3.connect(':memory:', check_same_thread=False)
+
+    def test_released_connection_is_reused(self):
+        pool = ConnectionPool(max_size=2)
+        first = pool.acquire(self.connect)
+        pool.release(first)
+        second = pool.acquire(self.connect)
+        assert second.connection is first.connection and second.reused, (
+            'Проверьте, что пул повторно выдаёт возвращённое подключение.'
+        )
+        assert pool.stats()['created'] == 1
+        assert pool.stats()['checked_out'] == 1
+
+    def test_broken_and_expired_connections_are_replaced(self):
+        pool = ConnectionPool(max_size=2, max_lifetime=60)
+        entry = pool.acquire(self.connect)
+        pool.release(entry)
+        entry.connection.close()
+        assert pool.acquire(self.connect).connection is not entry.connection, (
+            'Проверьте, что пул не выдаёт подключение, не прошедшее '
+            'проверку работоспособности.'
+        )
+
+        entry = pool.acquire(self.connect)
+        entry.created_at -= 60
+        pool.release(entry)
+        assert pool.stats()['idle'] == 0, (
+            'Проверьте, что подключение старше `MAX_LIFETIME` закрывается.'
+        )
+        assert pool.stats()['closed'] == 2
+
+    def test_waits_for_free_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        entry = pool.acquire(self.connect)
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(pool.acquire(self.connect)))
+        thread.start()
+        for _ in range(500):
+            if pool.stats()['waiting']:
+                break
+            time.sleep(0.01)
+        assert pool.stats()['waiting'] == 1, (
+            'Проверьте, что при занятом пуле поток ждёт подключения.'
+        )
+        pool.release(entry)
+        thread.join(5)
+        assert acquired[0].connection is entry.connection
+        assert pool.stats()['waiting'] == 0
+
+    def test_timeout_when_pool_is_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.acquire(self.connect)
+        with pytest.raises(PoolTimeout):
+            pool.acquire(self.connect)
+        assert pool.stats()['checked_out'] == 1
+
+
+class TestPooledBackend:
+
+    @pytest.fixture
+    def handler(self, tmp_path, django_db_blocker):
+        handler = ConnectionHandler({
+            'default': {
+                'ENGINE': 'api.backends.sqlite3',
+                'NAME': tmp_path / 'db.sqlite3',
+                'POOL': {'MAX_SIZE': 2},
+                'PRAGMAS': {'busy_timeout': 5000},
+            },
+        })
+        with django_db_blocker.unblock():
+            yield handler
+            handler.close_all()
+        close_pools()
+
+    def test_close_returns_connection_to_pool(self, handler):
+        connection = handler['default']
+        connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        assert pool_stats()['default']['idle'] == 1, (
+            'Проверьте, что закрытие подключения Django возвращает его '
+            'в пул.'
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+        assert connection.connection is raw and connection.connection_reused, (
+            'Проверьте, что новое подключение Django берётся из пула.'
+        )
+        assert pool_stats()['default']['created'] == 1
+
+    def test_connection_closed_in_atomic_is_discarded(self, handler):
+        connection = handler['default']
+        connection.set_autocommit(False)
+        connection.in_atomic_block = True
+        connection.close()
+        connection.in_atomic_block = False
+        assert pool_stats()['default']['idle'] == 0, (
+            'Проверьте, что подключение, закрытое внутри транзакции, '
+            'не возвращается в пул.'
+        )
+        assert pool_stats()['default']['checked_out'] == 0
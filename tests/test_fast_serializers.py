@@ -0,0 +1,104 @@
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import (CommentFastSerializer, FastReadSerializer,
+                                  PostFastSerializer, compile_strftime)
+from api.serializers import CommentSerializer, PostSerializer
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFastSerializers:
+
+    @pytest.fixture
+    def context(self):
+        return {'request': Request(APIRequestFactory().get('/api/v1/posts/'))}
+
+    @pytest.fixture
+    def posts(self, user, another_user, group_1, post, post_2):
+        Post.objects.create(text='Без сообщества   «кавычки»',
+                            author=another_user)
+        Post.objects.filter(pk=post.pk).update(
+            image='posts/cat.png',
+            image_variants={
+                'source': 'posts/cat.png',
+                'variants': {'webp': {'320': 'posts/cat-320.webp'}},
+            },
+        )
+        Post.objects.filter(pk=post_2.pk).update(
+            image='posts/old.png',
+            image_variants={'source': 'posts/older.png', 'variants': {}},
+        )
+        return Post.objects.select_related('author', 'group').order_by('id')
+
+    def assert_parity(self, serializer_class, fast_class, queryset, context):
+        expected = JSONRenderer().render(
+            serializer_class(queryset, many=True, context=context).data)
+        fast = fast_class(context)
+        actual = JSONRenderer().render(
+            fast.serialize(fast.get_queryset(queryset)))
+        assert actual == expected, (
+            f'Проверьте, что `{fast_class.__name__}` возвращает тот же '
+            f'JSON, что и `{serializer_class.__name__}`.'
+        )
+
+    @pytest.mark.parametrize('timezone_name', ('UTC', 'Asia/Vladivostok'))
+    def test_posts(self, posts, context, timezone_name):
+        with timezone.override(timezone_name):
+            self.assert_parity(PostSerializer, PostFastSerializer, posts,
+                               context)
+
+    def test_posts_without_request(self, posts):
+        self.assert_parity(PostSerializer, PostFastSerializer, posts, {})
+
+    def test_comments(self, context, comment_1_post, comment_2_post,
+                      comment_1_another_post):
+        comments = Comment.objects.select_related('author').order_by('id')
+        with timezone.override('Europe/Moscow'):
+            self.assert_parity(CommentSerializer, CommentFastSerializer,
+                               comments, context)
+
+    def test_list_endpoint(self, user_client, posts):
+        response = user_client.get('/api/v1/posts/')
+        request = response.wsgi_request
+        expected = PostSerializer(
+            Post.objects.all(), many=True,
+            context={'request': Request(request)}).data
+        assert response.content == JSONRenderer().render(expected), (
+            'Проверьте, что список постов возвращается быстрым путём без '
+            'изменения ответа.'
+        )
+
+    def test_unsupported_field(self):
+        class Serializer(CommentSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta(CommentSerializer.Meta):
+                fields = CommentSerializer.Meta.fields + ('extra',)
+
+        class FastSerializer(FastReadSerializer):
+            serializer_class = Serializer
+
+        with pytest.raises(ImproperlyConfigured):
+            FastSerializer()
+
+
+@pytest.mark.parametrize('output_format', (
+    '%Y-%m-%d %H:%M', '%d.%m.%Y %% %S', '%b %Y', 'год %',
+))
+def test_compile_strftime(output_format):
+    strftime = compile_strftime(output_format) or (
+        lambda value: value.strftime(output_format))
+    for value in (datetime.datetime(2024, 1, 2, 3, 4, 5),
+                  datetime.datetime(999, 12, 31, 23, 59, 59)):
+        assert strftime(value) == value.strftime(output_format), (
+            'Проверьте, что скомпилированный формат даты совпадает со '
+            '`strftime`.'
+        )
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from posts.models import Post, TimelineEntry, User
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    feed_url = '/api/v1/feed/'
+    follow_url = '/api/v1/follow/'
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def another_client(self, another_user):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION='Bearer '
+            f'{RefreshToken.for_user(another_user).access_token}'
+        )
+        return client
+
+    def get_feed_ids(self, client):
+        response = client.get(self.feed_url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.feed_url}` возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()]
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.feed_url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.feed_url}` возвращает ответ со статусом 401.'
+        )
+
+    @pytest.mark.parametrize('strategy', (
+        'api.feed.FanOutOnReadStrategy',
+        'api.feed.FanOutOnWriteStrategy',
+        'api.feed.HybridStrategy',
+    ))
+    def test_feed_strategies(self, settings, strategy, user_client,
+                             another_client, another_user, post,
+                             another_post):
+        settings.FEED_STRATEGY = strategy
+        user_client.post(self.follow_url,
+                         data={'following': another_user.username})
+        response = another_client.post(self.post_list_url,
+                                       data={'text': 'Новый пост'})
+        new_post_id = response.json()['id']
+
+        assert self.get_feed_ids(user_client) == [
+            new_post_id, another_post.id
+        ], (
+            f'Проверьте, что `{self.feed_url}` возвращает посты авторов, на '
+            'которых подписан пользователь, от новых к старым.'
+        )
+        assert self.get_feed_ids(another_client) == [], (
+            f'Проверьте, что `{self.feed_url}` не содержит постов авторов, на '
+            'которых пользователь не подписан.'
+        )
+
+    def test_feed_hybrid_skips_fan_out_for_heavy_authors(
+            self, settings, user_client, another_client, another_user):
+        settings.FEED_STRATEGY = 'api.feed.HybridStrategy'
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        user_client.post(self.follow_url,
+                         data={'following': another_user.username})
+        another_client.post(self.post_list_url, data={'text': 'Новый пост'})
+
+        assert not TimelineEntry.objects.exists(), (
+            'Проверьте, что посты авторов с большим числом подписчиков не '
+            'раскладываются по лентам при публикации.'
+        )
+        assert self.get_feed_ids(user_client) == list(
+            Post.objects.filter(author=another_user).values_list(
+                'id', flat=True)
+        ), (
+            'Проверьте, что посты авторов с большим числом подписчиков '
+            f'попадают в `{self.feed_url}` при чтении.'
+        )
+
+    def test_feed_hybrid_keeps_posts_after_author_becomes_light(
+            self, settings, user_client, another_client, another_user):
+        settings.FEED_STRATEGY = 'api.feed.HybridStrategy'
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        user_client.post(self.follow_url,
+                         data={'following': another_user.username})
+        heavy_post_id = another_client.post(
+            self.post_list_url, data={'text': 'Пост популярного автора'}
+        ).json()['id']
+
+        # Подписчиков у автора стало не больше порога.
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 1000
+        light_post_id = another_client.post(
+            self.post_list_url, data={'text': 'Новый пост'}).json()['id']
+        assert self.get_feed_ids(user_client) == [
+            light_post_id, heavy_post_id
+        ], (
+            'Проверьте, что посты, опубликованные, пока у автора было '
+            'больше `FEED_FANOUT_MAX_FOLLOWERS` подписчиков, остаются '
+            f'в `{self.feed_url}`, когда подписчиков становится меньше.'
+        )
+
+    def test_feed_hybrid_backfills_new_followers_of_heavy_author(
+            self, settings, user_client, another_client, another_user):
+        settings.FEED_STRATEGY = 'api.feed.HybridStrategy'
+        light_post_id = another_client.post(
+            self.post_list_url, data={'text': 'Пост автора'}).json()['id']
+
+        # Автор стал популярным.
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        heavy_post_id = another_client.post(
+            self.post_list_url, data={'text': 'Новый пост'}).json()['id']
+        user_client.post(self.follow_url,
+                         data={'following': another_user.username})
+
+        for max_followers in (0, 1000):
+            settings.FEED_FANOUT_MAX_FOLLOWERS = max_followers
+            assert self.get_feed_ids(user_client) == [
+                heavy_post_id, light_post_id
+            ], (
+                'Проверьте, что в ленту нового подписчика популярного '
+                'автора попадают все его посты и остаются в ней, когда '
+                'подписчиков у автора становится меньше порога.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_feed_command():
+    stdout = StringIO()
+    call_command('benchmark_feed', users=30, follows=5, posts=20,
+                 readers=10, stdout=stdout)
+    output = stdout.getvalue()
+    for strategy in ('FanOutOnReadStrategy', 'FanOutOnWriteStrategy',
+                     'HybridStrategy'):
+        assert strategy in output, (
+            'Проверьте, что команда `benchmark_feed` сравнивает все '
+            'стратегии ленты.'
+        )
+    assert not User.objects.exists() and not Post.objects.exists(), (
+        'Проверьте, что команда `benchmark_feed` откатывает созданные '
+        'данные.'
+    )
@@ -1,7 +1,9 @@
 from http import HTTPStatus
+import time
 
 import pytest
 
+from api.groups import group_cache
 from posts.models import Group
 
 
@@ -113,3 +115,19 @@ class TestGroupAPI:
             'виде словаря.'
         )
         self.check_group_info(test_data, '/api/v1/groups/{group_id}/')
+
+    def test_group_cache_expires(self, monkeypatch, group_1):
+        title = group_1.title
+        assert group_cache.get(group_1.pk).title == title
+        # Изменение в обход сигналов, как в процессе без общего кэша
+        # поколений.
+        Group.objects.filter(pk=group_1.pk).update(title='Новое название')
+        assert group_cache.get(group_1.pk).title == title
+
+        now = time.monotonic()
+        monkeypatch.setattr('api.groups.time.monotonic',
+                            lambda: now + 61)
+        assert group_cache.get(group_1.pk).title == 'Новое название', (
+            'Проверьте, что кэш сообществ перезагружается по истечении '
+            '`GROUP_CACHE_TTL`.'
+        )
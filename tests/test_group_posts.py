@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGroupPostsAPI:
+
+    group_url = '/api/v1/groups/'
+    group_posts_url = '/api/v1/groups/{group_id}/posts/'
+
+    def test_group_posts(self, client, group_1, post, post_2, another_post):
+        url = self.group_posts_url.format(group_id=group_1.id)
+        response = client.get(url, {'limit': 1})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [post_2.id], (
+            f'Проверьте, что `{url}` возвращает посты сообщества от новых '
+            'к старым.'
+        )
+
+        response = client.get(data['next'])
+        assert [item['id'] for item in response.json()['results']] == [
+            post.id
+        ], (
+            f'Проверьте, что `{url}` поддерживает курсорную пагинацию по '
+            'ссылке из поля `next`.'
+        )
+        assert response.json()['next'] is None
+
+    def test_group_posts_not_found(self, client):
+        url = self.group_posts_url.format(group_id=100500)
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_group_posts_invalidated(self, client, user, group_1, post):
+        url = self.group_posts_url.format(group_id=group_1.id)
+        client.get(url)
+        new_post = Post.objects.create(text='Новый', author=user,
+                                       group=group_1)
+        results = client.get(url).json()['results']
+        assert results[0]['id'] == new_post.id, (
+            'Проверьте, что кэш постов сообщества сбрасывается при '
+            'создании поста.'
+        )
+
+    def test_groups_served_from_process_cache(
+            self, client, group_1, group_2, django_assert_num_queries):
+        client.get(self.group_url)
+        with django_assert_num_queries(0):
+            # Другие URL не попадают в кэш ответов.
+            response = client.get(self.group_url, {'format': 'json'})
+            client.get(f'{self.group_url}{group_2.id}/')
+        assert len(response.json()) == 2
+
+        group_1.title = 'Новое название'
+        group_1.save()
+        response = client.get(f'{self.group_url}{group_1.id}/')
+        assert response.json()['title'] == 'Новое название', (
+            'Проверьте, что кэш сообществ сбрасывается при их изменении.'
+        )
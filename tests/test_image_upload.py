@@ -0,0 +1,220 @@
+import base64
+from http import HTTPStatus
+from io import BytesIO
+import os
+import tracemalloc
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+import pytest
+
+from api.serializers import Base64ImageField
+from posts.models import Post
+
+
+def make_image_data(width, height, noise=False, comment=None):
+    if noise:
+        image = Image.frombytes('RGB', (width, height),
+                                os.urandom(width * height * 3))
+    else:
+        image = Image.new('RGB', (width, height), color='red')
+    pnginfo = None
+    if comment is not None:
+        pnginfo = PngInfo()
+        pnginfo.add_text('Comment', comment)
+    buffer = BytesIO()
+    image.save(buffer, format='PNG', pnginfo=pnginfo)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'data:image/png;base64,{encoded}'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBase64ImageUpload:
+
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+
+    def create_post(self, user_client, image):
+        return user_client.post(
+            self.post_list_url,
+            data={'text': 'Пост с картинкой', 'image': image},
+            format='json',
+        )
+
+    def test_image_upload(self, user_client):
+        response = self.create_post(user_client, make_image_data(10, 10))
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос с изображением в формате base64 '
+            f'к `{self.post_list_url}` создаёт пост.'
+        )
+        post = Post.objects.get()
+        assert post.image.width == 10, (
+            'Проверьте, что изображение из base64 сохраняется без искажений.'
+        )
+
+    def test_image_upload_rejects_large_files(self, user_client, settings):
+        settings.IMAGE_UPLOAD_MAX_BYTES = 64
+        response = self.create_post(user_client, make_image_data(10, 10))
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображение больше `IMAGE_UPLOAD_MAX_BYTES` '
+            'отклоняется со статусом 400.'
+        )
+        assert not Post.objects.exists()
+
+    def test_image_upload_rejects_large_images(self, user_client, settings):
+        settings.IMAGE_UPLOAD_MAX_PIXELS = 99
+        response = self.create_post(user_client, make_image_data(10, 10))
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображение больше `IMAGE_UPLOAD_MAX_PIXELS` '
+            'пикселей отклоняется со статусом 400.'
+        )
+
+    def test_image_upload_rejects_invalid_data(self, user_client):
+        response = self.create_post(user_client, 'data:image/png;base64,!!')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректные данные base64 отклоняются со '
+            'статусом 400.'
+        )
+
+    @pytest.mark.parametrize('width', (10, 370, 371))
+    def test_image_decode_wrapped_base64(self, width):
+        buffer = BytesIO()
+        Image.frombytes('RGB', (width, width),
+                        os.urandom(width * width * 3)).save(buffer, 'PNG')
+        image = buffer.getvalue()
+        data = ('data:image/png;base64,'
+                + base64.encodebytes(image).decode('ascii'))
+
+        file = Base64ImageField().to_internal_value(data)
+        try:
+            assert file.read() == image, (
+                'Проверьте, что изображение в base64 с переносами строк '
+                'декодируется без искажений.'
+            )
+        finally:
+            file.close()
+
+    def test_image_decode_peak_memory(self):
+        data = make_image_data(1000, 1000, noise=True)
+        field = Base64ImageField()
+
+        tracemalloc.start()
+        try:
+            file = field.to_internal_value(data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        file.close()
+
+        assert len(data) > 3 * 1024 * 1024
+        assert peak < 1024 * 1024, (
+            'Проверьте, что декодирование изображения из base64 не держит '
+            f'в памяти полную копию файла: пик {peak} байт.'
+        )
+
+    def test_image_derivatives(self, user_client, settings):
+        settings.IMAGE_DERIVATIVES_ASYNC = False
+        response = self.create_post(user_client, make_image_data(800, 400))
+        srcset = response.json()['image_srcset']
+        assert set(srcset) == set(settings.IMAGE_DERIVATIVE_FORMATS), (
+            'Проверьте, что ответ содержит поле `image_srcset` с копиями '
+            'изображения во всех форматах.'
+        )
+
+        post = Post.objects.get()
+        variants = post.image_variants['variants']
+        assert set(variants['webp']) == {'320', '640'}, (
+            'Проверьте, что копии изображения создаются для всех ширин, '
+            'не превышающих ширину оригинала.'
+        )
+        with post.image.storage.open(variants['jpeg']['320']) as file:
+            assert Image.open(file).size == (320, 160)
+
+        response = user_client.get(f'{self.post_list_url}{post.id}/')
+        srcset = response.json()['image_srcset']
+        assert srcset['webp']['320'].endswith(variants['webp']['320']), (
+            'Проверьте, что `image_srcset` содержит URL готовых копий '
+            'изображения.'
+        )
+        assert srcset['webp']['1280'] == response.json()['image'], (
+            'Проверьте, что вместо отсутствующих копий `image_srcset` '
+            'содержит URL оригинала.'
+        )
+
+    def test_identical_images_stored_once(self, user_client):
+        image = make_image_data(10, 10)
+        first = self.create_post(user_client, image).json()
+        second = self.create_post(user_client, image).json()
+        assert first['image'] == second['image'], (
+            'Проверьте, что одинаковые изображения сохраняются в один файл.'
+        )
+
+        name = Post.objects.get(id=first['id']).image.name
+        storage = Post._meta.get_field('image').storage
+        user_client.delete(f'{self.post_list_url}{first["id"]}/')
+        assert storage.exists(name), (
+            'Проверьте, что файл изображения не удаляется, пока на него '
+            'ссылаются другие посты.'
+        )
+        user_client.delete(f'{self.post_list_url}{second["id"]}/')
+        assert not storage.exists(name), (
+            'Проверьте, что файл изображения удаляется вместе с последним '
+            'ссылающимся на него постом.'
+        )
+
+    def test_derivatives_of_other_images_kept(self, user_client, settings):
+        settings.IMAGE_DERIVATIVES_ASYNC = False
+        first_id = self.create_post(
+            user_client, make_image_data(400, 200, comment='1')).json()['id']
+        second_id = self.create_post(
+            user_client, make_image_data(400, 200, comment='2')).json()['id']
+        first = Post.objects.get(id=first_id)
+        second = Post.objects.get(id=second_id)
+        assert first.image.name != second.image.name
+
+        user_client.delete(f'{self.post_list_url}{first_id}/')
+        storage = Post._meta.get_field('image').storage
+        for widths in second.image_variants['variants'].values():
+            for name in widths.values():
+                assert storage.exists(name), (
+                    'Проверьте, что при удалении поста не удаляются копии '
+                    'изображения, которые использует другой пост.'
+                )
+        for widths in first.image_variants['variants'].values():
+            for name in widths.values():
+                assert not storage.exists(name), (
+                    'Проверьте, что копии изображения удаляются вместе '
+                    'с последним ссылающимся на него постом.'
+                )
+
+    def test_image_restored_after_concurrent_release(self, post):
+        image = base64.b64decode(make_image_data(10, 10).split(',')[1])
+        storage = Post._meta.get_field('image').storage
+        with transaction.atomic():
+            post.image = ContentFile(image, 'image.png')
+            post.save()
+            # Освобождение того же файла другим запросом, который не
+            # видит незафиксированный пост.
+            storage.delete(post.image.name)
+        assert storage.exists(post.image.name), (
+            'Проверьте, что файл изображения, удалённый до фиксации '
+            'ссылающегося на него поста, восстанавливается.'
+        )
+
+    def test_replaced_image_released(self, user_client):
+        post_id = self.create_post(
+            user_client, make_image_data(10, 10)).json()['id']
+        name = Post.objects.get(id=post_id).image.name
+        user_client.patch(f'{self.post_list_url}{post_id}/',
+                          data={'image': make_image_data(20, 20)},
+                          format='json')
+        storage = Post._meta.get_field('image').storage
+        assert not storage.exists(name), (
+            'Проверьте, что после замены изображения прежний файл '
+            'удаляется, если на него больше не ссылаются.'
+        )
@@ -0,0 +1,118 @@
+import datetime
+import decimal
+from io import BytesIO, StringIO
+import json
+
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.functional import lazy
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from posts.models import Post
+
+DATA = {
+    'id': 1,
+    'text': 'Пост с разделителем   и "кавычками"',
+    'pub_date': '2024-01-02 03:04',
+    'created': timezone.make_aware(datetime.datetime(2024, 1, 2, 3, 4, 5)),
+    'updated': datetime.datetime(2024, 1, 2, 3, 4, 5, 678,
+                                 tzinfo=datetime.timezone.utc),
+    'naive': datetime.datetime(2024, 1, 2, 3, 4, 5),
+    'day': datetime.date(2024, 1, 2),
+    'time': datetime.time(3, 4, 5),
+    'price': decimal.Decimal('1.5'),
+    'lazy': lazy(lambda: 'ленивая строка', str)(),
+    'image_srcset': {'webp': {320: None, '640': 'http://x/640.webp'}},
+    'results': [{'id': 2, 'group': None, 'flag': True}, (3, 4.25)],
+}
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.skipif(renderers.orjson is None,
+                        reason='orjson не установлен')
+    def test_matches_drf_renderer(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA), (
+            'Проверьте, что `FastJSONRenderer` возвращает те же байты, что '
+            'и `JSONRenderer`, в том числе для дат и времени.'
+        )
+
+    def test_big_integers_use_drf_renderer(self):
+        data = {'ids': [2 ** 70, -2 ** 64]}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data), (
+            'Проверьте, что целые числа, которые не сериализует `orjson`, '
+            'отрисовываются стандартным `JSONRenderer`.'
+        )
+
+    def test_floats_keep_value(self):
+        data = {'values': [1e-7, 1e16, 0.1, 4.25]}
+        assert json.loads(FastJSONRenderer().render(data)) == data, (
+            'Проверьте, что `FastJSONRenderer` сохраняет значения чисел с '
+            'плавающей точкой.'
+        )
+
+    def test_falls_back_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA), (
+            'Проверьте, что без `orjson` используется стандартный '
+            '`JSONRenderer`.'
+        )
+
+    def test_indent_uses_drf_renderer(self):
+        rendered = FastJSONRenderer().render(
+            {'id': 1}, 'application/json; indent=4')
+        assert rendered == b'{\n    "id": 1\n}'
+        assert FastJSONRenderer().render(None) == b''
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_json_command():
+    stdout = StringIO()
+    call_command('benchmark_json', posts=20, repeat=1, stdout=stdout)
+    output = stdout.getvalue()
+    assert 'FastJSONRenderer' in output and 'JSONRenderer' in output, (
+        'Проверьте, что команда `benchmark_json` сравнивает рендереры.'
+    )
+    assert not Post.objects.exists(), (
+        'Проверьте, что команда `benchmark_json` откатывает созданные посты.'
+    )
+
+
+class TestFastJSONParser:
+
+    def parse(self, body, parser_class=FastJSONParser, **context):
+        return parser_class().parse(BytesIO(body), parser_context=context)
+
+    def test_matches_drf_parser(self):
+        body = ('{"text": "Пост \\u2028", "group": null, "ids": [1, 2.5], '
+                '"big": 123456789012345678901234567890}').encode()
+        assert self.parse(body) == self.parse(body, JSONParser), (
+            'Проверьте, что `FastJSONParser` разбирает тело запроса так '
+            'же, как `JSONParser`.'
+        )
+
+    @pytest.mark.parametrize('body', (b'{"text": ', b'{"value": NaN}'))
+    def test_invalid_json(self, body):
+        with pytest.raises(ParseError) as fast_error:
+            self.parse(body)
+        with pytest.raises(ParseError) as drf_error:
+            self.parse(body, JSONParser)
+        assert str(fast_error.value) == str(drf_error.value), (
+            'Проверьте, что сообщение об ошибке разбора совпадает с '
+            'сообщением `JSONParser`.'
+        )
+
+    def test_other_encodings_and_fallback(self, monkeypatch):
+        body = '{"text": "Пост"}'.encode('utf-16')
+        assert self.parse(body, encoding='utf-16') == {'text': 'Пост'}
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert self.parse(b'{"id": 1}') == {'id': 1}
@@ -142,3 +142,167 @@ class TestJWT:
                 f'отправленный к `{url}`, возвращает ответ со статусом 200. '
                 'Корректными данными считаются `refresh`- и `access`-токены.'
             )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachingJWTAuthentication:
+    url = '/api/v1/follow/'
+
+    def test_token_user_cached(self, user_client,
+                               django_assert_num_queries):
+        user_client.get(self.url)
+        # Остаётся только запрос подписок: пользователь берётся из кэша.
+        with django_assert_num_queries(1):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же токеном '
+            'аутентифицируется без обращения к БД.'
+        )
+
+    def test_deactivated_user_rejected(self, user_client, user):
+        user_client.get(self.url)
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после деактивации пользователя его токен '
+            'перестаёт приниматься, несмотря на кэш.'
+        )
+
+    def test_user_cached_before_commit_discarded(self, user_client, user,
+                                                 token):
+        from django.db import transaction
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.authentication import token_user_cache
+        from posts.models import User
+
+        raw_token = token['access'].encode()
+        with transaction.atomic():
+            user.is_active = False
+            user.save()
+            # Конкурентный запрос до фиксации загрузил ещё активного
+            # пользователя и положил его в кэш.
+            active_user = User.objects.get(pk=user.pk)
+            active_user.is_active = True
+            token_user_cache.set(raw_token, active_user,
+                                 AccessToken(token['access']), 300)
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что записи кэша токенов пользователя удаляются '
+            'ещё раз после фиксации транзакции, изменившей пользователя.'
+        )
+
+    def test_cache_entry_expires(self, user_client, settings,
+                                 django_assert_num_queries):
+        settings.JWT_USER_CACHE_MAX_TTL = 0
+        user_client.get(self.url)
+        with django_assert_num_queries(2):
+            user_client.get(self.url)
+
+    def test_benchmark_auth_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from posts.models import User
+
+        stdout = StringIO()
+        call_command('benchmark_auth', requests=20, stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        assert lines[0].startswith('JWTAuthentication') and lines[
+            0].endswith('запросов к БД: 20.'), (
+            'Проверьте, что команда `benchmark_auth` замеряет '
+            '`JWTAuthentication` с запросом пользователя на каждый запрос.'
+        )
+        assert lines[1].startswith('CachingJWTAuthentication') and lines[
+            1].endswith('запросов к БД: 1.'), (
+            'Проверьте, что команда `benchmark_auth` замеряет '
+            '`CachingJWTAuthentication` с кэшем пользователей.'
+        )
+        assert not User.objects.exists(), (
+            'Проверьте, что команда `benchmark_auth` откатывает созданного '
+            'пользователя.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStatelessJWTAuthentication:
+    url_create = '/api/v1/jwt/create/'
+    post_list_url = '/api/v1/posts/'
+
+    def test_token_contains_username(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        response = client.post(self.url_create, data={
+            'username': user.username, 'password': '1234567'
+        })
+        token = AccessToken(response.json()['access'])
+        assert token['username'] == user.username, (
+            f'Проверьте, что токен, выданный `{self.url_create}`, содержит '
+            'имя пользователя.'
+        )
+
+    def test_read_does_not_load_user(self, user_client, post,
+                                     django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = user_client.get(self.post_list_url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_write_checks_user(self, user_client, user):
+        user.is_active = False
+        user.save()
+        response = user_client.post(self.post_list_url,
+                                    data={'text': 'Новый пост'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что при записи пользователь загружается из БД и '
+            'неактивный пользователь не может создать пост.'
+        )
+
+    def test_token_backed_user_is_active_loaded(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+        from api.authentication import StatelessJWTAuthentication
+
+        user.is_active = False
+        user.save()
+        token_user = StatelessJWTAuthentication().get_user(
+            AccessToken.for_user(user))
+        with pytest.raises(AuthenticationFailed):
+            # `is_active` не задан заранее: обращение загружает и
+            # проверяет пользователя.
+            token_user.is_active
+
+    @pytest.mark.parametrize('method, url, data', (
+        ('patch', '/api/v1/posts/{post_id}/', {'text': 'Изменённый пост'}),
+        ('put', '/api/v1/posts/{post_id}/', {'text': 'Изменённый пост'}),
+        ('delete', '/api/v1/posts/{post_id}/', None),
+        ('patch', '/api/v1/posts/{post_id}/comments/{comment_id}/',
+         {'text': 'Изменённый комментарий'}),
+        ('delete', '/api/v1/posts/{post_id}/comments/{comment_id}/', None),
+        ('post', '/api/v1/posts/bulk-delete/', 'ids'),
+    ))
+    def test_deactivated_user_cannot_modify(self, user_client, user, post,
+                                            comment_1_post, method, url,
+                                            data):
+        from posts.models import Comment, Post
+
+        # Токен уже принят до деактивации пользователя.
+        user_client.get(self.post_list_url)
+        user.is_active = False
+        user.save()
+
+        ids = {'post_id': post.id, 'comment_id': comment_1_post.id}
+        if data == 'ids':
+            data = {'ids': [post.id]}
+        response = getattr(user_client, method)(
+            url.format(**ids), data=data, format='json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен деактивированного пользователя не '
+            'позволяет изменять и удалять посты и комментарии.'
+        )
+        assert Post.objects.filter(pk=post.pk, text=post.text).exists()
+        assert Comment.objects.filter(
+            pk=comment_1_post.pk, text=comment_1_post.text).exists()
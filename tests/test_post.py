@@ -127,6 +127,47 @@ class TestPostAPI:
             db_post=db_post
         )
 
+    def test_posts_get_cursor_paginated(self, user_client, post, post_2,
+                                        another_post):
+        url = f'{self.post_list_url}?cursor=&limit=2'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что GET-запрос с параметром `cursor` к '
+            f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        assert 'results' in test_data and 'next' in test_data, (
+            'Убедитесь, что GET-запрос с параметром `cursor` к '
+            f'`{self.post_list_url}` возвращает поля `results` и `next`.'
+        )
+        assert [item['id'] for item in test_data['results']] == [
+            another_post.id, post_2.id
+        ], (
+            'Убедитесь, что курсорная пагинация возвращает посты от новых '
+            'к старым.'
+        )
+        assert test_data['next'], (
+            'Убедитесь, что курсорная пагинация возвращает ссылку на '
+            'следующую страницу.'
+        )
+
+        response = user_client.get(test_data['next'])
+        test_data = response.json()
+        assert [item['id'] for item in test_data['results']] == [post.id], (
+            'Убедитесь, что ссылка `next` курсорной пагинации ведёт на '
+            'следующую страницу постов.'
+        )
+        assert test_data['next'] is None, (
+            'Убедитесь, что на последней странице курсорной пагинации '
+            '`next` равен `None`.'
+        )
+
+        response = user_client.get(f'{self.post_list_url}?cursor=invalid')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Убедитесь, что запрос с некорректным курсором возвращает ответ '
+            'со статусом 404.'
+        )
+
     def test_post_create_auth_with_invalid_data(self, user_client):
         posts_count = Post.objects.count()
         response = user_client.post(self.post_list_url, data={})
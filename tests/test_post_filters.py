@@ -0,0 +1,107 @@
+import datetime
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostFilters:
+
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def posts(self, post, post_2, another_post):
+        Post.objects.filter(id=post.id).update(
+            pub_date=datetime.datetime(2024, 1, 10, 12,
+                                       tzinfo=datetime.timezone.utc))
+        return post, post_2, another_post
+
+    def get_ids(self, client, **params):
+        response = client.get(self.post_list_url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` с '
+            f'параметрами {params} возвращает ответ со статусом 200.'
+        )
+        return {item['id'] for item in response.json()}
+
+    def test_filter_by_group(self, client, posts, group_1):
+        post, post_2, another_post = posts
+        expected = {post.id, post_2.id}
+        assert self.get_ids(client, group=group_1.id) == expected, (
+            'Проверьте, что посты фильтруются по идентификатору группы '
+            'в параметре `group`.'
+        )
+        assert self.get_ids(client, group=group_1.slug) == expected, (
+            'Проверьте, что посты фильтруются по слагу группы в параметре '
+            '`group`.'
+        )
+        assert self.get_ids(client, group='unknown') == set()
+
+    def test_filter_by_group_numeric_value(self, client, posts, group_1):
+        assert self.get_ids(client, group='9' * 23) == set(), (
+            'Проверьте, что идентификатор группы вне диапазона в параметре '
+            '`group` возвращает пустой результат, а не ошибку сервера.'
+        )
+        group_1.slug = str(group_1.id + 1000)
+        group_1.save()
+        assert self.get_ids(client, group=group_1.slug) == set(), (
+            'Проверьте, что значение `group` из одних цифр всегда '
+            'считается идентификатором группы.'
+        )
+
+    def test_filter_by_author(self, client, posts, another_user):
+        assert self.get_ids(client, author=another_user.username) == {
+            posts[2].id
+        }, (
+            'Проверьте, что посты фильтруются по имени автора в параметре '
+            '`author`.'
+        )
+
+    def test_filter_by_date(self, client, posts):
+        post, post_2, another_post = posts
+        assert self.get_ids(client, until='2024-01-10') == {post.id}, (
+            'Проверьте, что параметр `until` с датой включает посты за '
+            'весь день.'
+        )
+        assert self.get_ids(client, since='2024-01-11') == {
+            post_2.id, another_post.id
+        }
+        assert self.get_ids(
+            client, since='2024-01-10T12:00:00Z', until='2024-01-10T12:00Z',
+        ) == {post.id}
+
+    def test_filter_invalid_date(self, client):
+        response = client.get(self.post_list_url, {'since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректная дата в параметре `since` '
+            'возвращает ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('param, index', (
+        ('group', 'post_group_pub_date_idx'),
+        ('author', 'post_author_pub_date_idx'),
+    ))
+    def test_filter_single_indexed_query(self, client, posts, group_1,
+                                         param, index):
+        value = {'group': group_1.slug, 'author': posts[0].author.username}
+        # Первый запрос заполняет кэш слагов и имён.
+        self.get_ids(client, **{param: value[param], 'since': '2024-01-01'})
+
+        with CaptureQueriesContext(connection) as context:
+            self.get_ids(client, **{param: value[param]})
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что фильтр по слагу группы или имени автора '
+            'выполняется одним запросом: слаги и имена должны браться из '
+            'кэша.'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN '
+                           + context.captured_queries[0]['sql'])
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert index in plan, (
+            f'Проверьте, что фильтр `{param}` использует индекс `{index}`.'
+        )
@@ -0,0 +1,163 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    comment_detail_url = '/api/v1/posts/{post_id}/comments/{comment_id}/'
+
+    POSTS_COUNT = 15
+
+    def check_query_budget(self, client, url, budget,
+                           django_assert_max_num_queries):
+        with django_assert_max_num_queries(budget):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response
+
+    @pytest.fixture
+    def many_posts(self, django_user_model, group_1):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author_{index}', password='1234567'
+            )
+            for index in range(self.POSTS_COUNT)
+        ]
+        Post.objects.bulk_create(
+            Post(text=f'Пост {index}', author=author, group=group_1)
+            for index, author in enumerate(authors)
+        )
+        return list(Post.objects.all())
+
+    def test_post_list_query_budget(self, client, many_posts,
+                                    django_assert_max_num_queries):
+        response = self.check_query_budget(
+            client, self.post_list_url, 1, django_assert_max_num_queries
+        )
+        assert len(response.json()) == self.POSTS_COUNT, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` возвращает '
+            'все посты.'
+        )
+
+    def test_post_list_paginated_query_budget(self, client, many_posts,
+                                              django_assert_max_num_queries):
+        # Один запрос на COUNT(*) и один на выборку страницы.
+        self.check_query_budget(
+            client, f'{self.post_list_url}?limit={self.POSTS_COUNT}',
+            2, django_assert_max_num_queries
+        )
+
+    def test_post_detail_query_budget(self, client, many_posts,
+                                      django_assert_max_num_queries):
+        self.check_query_budget(
+            client, self.post_detail_url.format(post_id=many_posts[0].id),
+            1, django_assert_max_num_queries
+        )
+
+    def test_post_list_auth_query_budget(self, user_client, many_posts,
+                                         django_assert_max_num_queries):
+        # Пользователь строится по токену без запроса к БД.
+        self.check_query_budget(
+            user_client, self.post_list_url, 1,
+            django_assert_max_num_queries
+        )
+
+    @pytest.fixture
+    def many_comments(self, django_user_model, post):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'commentator_{index}', password='1234567'
+            )
+            for index in range(self.POSTS_COUNT)
+        ]
+        Comment.objects.bulk_create(
+            Comment(text=f'Коммент {index}', author=author, post=post)
+            for index, author in enumerate(authors)
+        )
+        return list(Comment.objects.filter(post=post))
+
+    def test_comment_list_query_budget(self, client, post, many_comments,
+                                       django_assert_max_num_queries):
+        # Запрос поста и запрос комментариев вместе с авторами.
+        response = self.check_query_budget(
+            client, self.comments_url.format(post_id=post.id), 2,
+            django_assert_max_num_queries
+        )
+        assert [item['id'] for item in response.json()] == [
+            comment.id for comment in many_comments
+        ], (
+            'Проверьте, что комментарии возвращаются в порядке добавления.'
+        )
+
+    def test_comment_create_query_budget(self, user_client, post,
+                                         django_assert_max_num_queries):
+        # Пользователь по токену, пост, вставка комментария и счётчик
+        # комментариев поста в транзакции (BEGIN).
+        with django_assert_max_num_queries(5):
+            response = user_client.post(
+                self.comments_url.format(post_id=post.id),
+                data={'text': 'Новый комментарий'},
+            )
+        assert response.status_code == 201
+
+    def test_comment_update_query_budget(self, user_client, post,
+                                         comment_1_post,
+                                         django_assert_max_num_queries):
+        # Пользователь по токену (проверка активности при записи), пост,
+        # комментарий и обновление: права проверяются по идентификатору
+        # автора без загрузки автора комментария.
+        with django_assert_max_num_queries(4):
+            response = user_client.patch(
+                self.comment_detail_url.format(
+                    post_id=post.id, comment_id=comment_1_post.id),
+                data={'text': 'Изменённый комментарий'},
+            )
+        assert response.status_code == 200
+
+    def test_comment_delete_query_budget(self, user_client, post,
+                                         comment_1_post,
+                                         django_assert_max_num_queries):
+        # Пользователь по токену, пост, комментарий, удаление и счётчик
+        # комментариев поста в транзакции (BEGIN).
+        with django_assert_max_num_queries(6):
+            response = user_client.delete(
+                self.comment_detail_url.format(
+                    post_id=post.id, comment_id=comment_1_post.id),
+            )
+        assert response.status_code == 204
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def check_query_plans(self, post):
+        call_command('check_query_plans', max_rows=0,
+                     url_kwarg=[f'post_id={post.id}'], stdout=StringIO())
+
+    # Модуль sqlite3 кэширует подготовленные EXPLAIN-запросы и не
+    # перестраивает их после DROP INDEX, поэтому этот тест идёт первым.
+    def test_query_plans_detect_full_scan(self, post, comment_1_post):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Comment._meta.db_table)
+            for name, constraint in constraints.items():
+                if constraint['index'] and 'post_id' in constraint['columns']:
+                    cursor.execute(f'DROP INDEX "{name}"')
+
+        with pytest.raises(CommandError, match='posts_comment'):
+            self.check_query_plans(post)
+
+    def test_query_plans_use_indexes(self, post, comment_1_post, follow_1):
+        self.check_query_plans(post)
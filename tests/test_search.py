@@ -0,0 +1,111 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from api.search import get_search_backend
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture(autouse=True)
+    def search_index(self):
+        # Очистка БД между тестами не затрагивает таблицу FTS5.
+        get_search_backend().rebuild()
+
+    @pytest.fixture
+    def posts(self, user):
+        return [
+            Post.objects.create(text=text, author=user)
+            for text in (
+                'Кошка спит на окне',
+                'Собака и кошка играют, кошка убегает',
+                'Погода сегодня хорошая',
+            )
+        ]
+
+    def search(self, client, query, **params):
+        response = client.get(self.post_list_url,
+                              {'search': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` с '
+            'параметром `search` возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_search_ranked(self, client, posts):
+        results = [post['id'] for post in self.search(client, 'КОШКА')]
+        assert results == [posts[1].id, posts[0].id], (
+            'Проверьте, что поиск находит посты, содержащие все слова '
+            'запроса без учёта регистра, и упорядочивает их по '
+            'релевантности.'
+        )
+        assert [post['id'] for post in self.search(client, 'кошка окне')] == [
+            posts[0].id
+        ]
+
+    def test_search_paginated(self, client, posts):
+        data = self.search(client, 'кошка', limit=1, offset=1)
+        assert data['count'] == 2, (
+            'Проверьте, что результаты поиска поддерживают пагинацию.'
+        )
+        assert [post['id'] for post in data['results']] == [posts[0].id]
+
+    def test_search_rejects_cursor(self, client, posts):
+        response = client.get(self.post_list_url,
+                              {'search': 'кошка', 'cursor': ''})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсорная пагинация, которая упорядочивает '
+            'посты по дате, отклоняется для результатов поиска со '
+            'статусом 400.'
+        )
+
+    def test_search_index_updated(self, user_client, client, posts):
+        user_client.patch(f'{self.post_list_url}{posts[2].id}/',
+                          data={'text': 'Кошка на прогулке'}, format='json')
+        user_client.delete(f'{self.post_list_url}{posts[0].id}/')
+        assert {post['id'] for post in self.search(client, 'кошка')} == {
+            posts[1].id, posts[2].id
+        }, (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении постов.'
+        )
+
+    def test_search_syntax_is_escaped(self, client, posts):
+        assert self.search(client, '"кошка* (') == self.search(
+            client, 'кошка'), (
+            'Проверьте, что спецсимволы в запросе не разбираются как '
+            'синтаксис поискового движка.'
+        )
+        assert self.search(client, '!!!') == []
+
+    def test_simple_search_backend(self, client, posts, settings):
+        settings.POST_SEARCH_BACKEND = 'api.search.SimpleSearchBackend'
+        assert [post['id'] for post in self.search(client, 'играют')] == [
+            posts[1].id
+        ], (
+            'Проверьте, что `SimpleSearchBackend` находит посты без '
+            'поискового индекса.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_search_command():
+    stdout = StringIO()
+    call_command('benchmark_search', posts=200, vocabulary=50, repeat=1,
+                 stdout=stdout)
+    output = stdout.getvalue()
+    assert ('SQLiteFTS5Backend' in output
+            and 'SimpleSearchBackend' in output), (
+        'Проверьте, что команда `benchmark_search` сравнивает поиск FTS5 '
+        'с поиском `icontains`.'
+    )
+    assert not Post.objects.exists(), (
+        'Проверьте, что команда `benchmark_search` откатывает созданные '
+        'посты.'
+    )
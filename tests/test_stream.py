@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+from api.events import DISCONNECT, SubscriptionClosed, broker
+from api.stream import stream_events
+
+
+async def subscribe(predicate=None):
+    return broker.subscribe(predicate)
+
+
+def run_stream(query_string='', headers=(), events=()):
+    """
+    Подключается к потоку, публикует события и возвращает отправленные
+    клиенту сообщения ASGI.
+    """
+    async def main():
+        received = asyncio.Queue()
+        messages = []
+
+        async def receive():
+            return await received.get()
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/stream/',
+                 'query_string': query_string.encode(),
+                 'headers': list(headers)}
+        task = asyncio.ensure_future(stream_events(scope, receive, send))
+        for _ in range(100):
+            if len(broker) or task.done():
+                break
+            await asyncio.sleep(0.01)
+        for event in events:
+            broker.publish(**event)
+        for _ in range(100):
+            await asyncio.sleep(0)
+        await received.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(task, 1)
+        return messages
+
+    return asyncio.run(main())
+
+
+def get_events(messages):
+    body = b''.join(message.get('body', b'') for message in messages)
+    return [
+        dict(line.split(': ', 1) for line in chunk.splitlines())
+        for chunk in body.decode().split('\n\n') if chunk
+    ]
+
+
+class TestEventBroker:
+
+    def test_drop_oldest(self, settings):
+        settings.EVENT_STREAM_QUEUE_SIZE = 2
+
+        async def main():
+            subscription = await subscribe()
+            try:
+                for post_id in range(1, 4):
+                    broker.publish('post', post_id=post_id)
+                return [await subscription.get() for _ in range(2)]
+            finally:
+                broker.unsubscribe(subscription)
+
+        (first, dropped), (second, _) = asyncio.run(main())
+        assert (first['post_id'], second['post_id'], dropped) == (2, 3, 1), (
+            'Проверьте, что при переполнении очереди подписчика '
+            'отбрасываются самые старые события и их число сообщается.'
+        )
+
+    def test_disconnect_policy(self, settings):
+        settings.EVENT_STREAM_QUEUE_SIZE = 1
+        settings.EVENT_STREAM_DROP_POLICY = DISCONNECT
+
+        async def main():
+            subscription = await subscribe()
+            try:
+                broker.publish('post', post_id=1)
+                broker.publish('post', post_id=2)
+                await subscription.get()
+                with pytest.raises(SubscriptionClosed):
+                    await subscription.get()
+            finally:
+                broker.unsubscribe(subscription)
+
+        asyncio.run(main())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestEventStream:
+
+    def test_stream_filtered_by_group(self):
+        messages = run_stream('group=2', events=(
+            {'event_type': 'post', 'post_id': 1, 'author_id': 1,
+             'group_id': 2},
+            {'event_type': 'post', 'post_id': 2, 'author_id': 1,
+             'group_id': 3},
+        ))
+        assert messages[0]['status'] == 200
+        assert (b'content-type', b'text/event-stream') in (
+            messages[0]['headers'])
+        events = get_events(messages)
+        assert [json.loads(event['data'])['post_id'] for event in events] == [
+            1
+        ], (
+            'Проверьте, что поток событий с параметром `group` отдаёт '
+            'только события постов сообщества.'
+        )
+        assert not len(broker), (
+            'Проверьте, что после отключения клиента подписка удаляется.'
+        )
+
+    def test_stream_following_requires_auth(self):
+        messages = run_stream('following=1')
+        assert messages[0]['status'] == 401
+
+    def test_stream_following(self, user, another_user, follow_1, token):
+        messages = run_stream(
+            'following=1',
+            headers=[(b'authorization', f'Bearer {token["access"]}'.encode())],
+            events=(
+                {'event_type': 'post', 'post_id': 1,
+                 'author_id': another_user.id, 'group_id': None},
+                {'event_type': 'post', 'post_id': 2,
+                 'author_id': user.id, 'group_id': None},
+            ),
+        )
+        events = get_events(messages)
+        assert [json.loads(event['data'])['post_id'] for event in events] == [
+            1
+        ], (
+            'Проверьте, что поток событий с параметром `following=1` отдаёт '
+            'только события авторов, на которых подписан пользователь.'
+        )
+
+    def test_signals_publish_events(self, user, post):
+        loop = asyncio.new_event_loop()
+        subscription = loop.run_until_complete(subscribe())
+        try:
+            comment = post.comments.create(author=user, text='Комментарий')
+            event, _ = loop.run_until_complete(subscription.get())
+        finally:
+            broker.unsubscribe(subscription)
+            loop.close()
+        assert event == {
+            'id': event['id'], 'type': 'comment', 'comment_id': comment.id,
+            'post_id': post.id, 'author_id': user.id,
+            'group_id': post.group_id,
+        }, (
+            'Проверьте, что создание комментария публикует событие в поток.'
+        )
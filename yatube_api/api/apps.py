@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .cache import check_generation_cache
+        from .routers import check_sticky_cache
+
+        checks.register(check_generation_cache, checks.Tags.caches)
+        checks.register(check_sticky_cache, checks.Tags.caches)
@@ -0,0 +1,116 @@
+"""
+Данный модуль содержит асинхронный путь чтения для ASGI.
+
+Django 3.2 не поддерживает асинхронный ORM, а DRF — асинхронные
+представления, поэтому асинхронное представление-обёртка отдаёт из
+цикла событий только то, что не требует БД: закэшированные ответы
+`CachedResponseMixin` и ответы 304 на условные запросы. Аутентификация
+`StatelessJWTAuthentication`, проверка прав и сериализация в JSON
+выполняются без обращения к БД. Поколение кэша читается из общего
+кэша поколений (по умолчанию файлового) в отдельном потоке, чтобы
+дисковый ввод-вывод не блокировал цикл событий. При
+промахе кэша, ошибке или записи запрос передаётся исходному синхронному
+представлению в пул потоков.
+
+Обёртка включается настройкой `API_ASYNC_READS` (см. `yatube_api/asgi.py`).
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation
+from django.http import HttpResponse
+from django.urls import URLPattern
+
+from rest_framework.exceptions import APIException
+
+from .cache import CachedResponseMixin, get_generation
+
+READ_ACTIONS = ('list', 'retrieve')
+
+
+class CacheMiss(Exception):
+    """
+    Ответа нет в кэше, и его нужно построить синхронным представлением.
+    """
+
+
+def _raise_cache_miss(*args, **kwargs):
+    raise CacheMiss
+
+
+# Чтение поколения не обращается к БД, поэтому не требует общего потока
+# синхронного кода.
+get_generation_async = sync_to_async(get_generation, thread_sensitive=False)
+
+
+async def get_cached_read(view, request, *args, **kwargs):
+    """
+    Возвращает закэшированный ответ ViewSet на GET-запрос или None, если
+    запрос нужно выполнить синхронно.
+    """
+    action = view.actions.get(request.method.lower())
+    if action not in READ_ACTIONS:
+        return None
+
+    self = view.cls(**view.initkwargs)
+    self.action_map = view.actions
+    self.action = action
+    self.args = args
+    self.kwargs = kwargs
+    self.request = drf_request = self.initialize_request(
+        request, *args, **kwargs)
+    self.headers = self.default_response_headers
+    try:
+        self.initial(drf_request, *args, **kwargs)
+        self.cache_generation = await get_generation_async(
+            self.get_cache_namespace())
+        response = self.get_cached_response(
+            _raise_cache_miss, drf_request, *args, **kwargs)
+    except (CacheMiss, APIException, SynchronousOnlyOperation):
+        return None
+
+    response = self.finalize_response(drf_request, response, *args, **kwargs)
+    if not hasattr(response, 'render'):
+        return response
+    # Отрисовываем JSON здесь и отдаём обычный HttpResponse: иначе Django
+    # отрисует ответ в пуле потоков.
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    return plain
+
+
+def async_read_view(view):
+    """
+    Оборачивает представление ViewSet в асинхронное, отвечающее на
+    чтение из кэша без перехода в пул потоков.
+    """
+    sync_view = sync_to_async(view)
+
+    async def async_view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            response = await get_cached_read(
+                view, request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_view(request, *args, **kwargs)
+
+    async_view.cls = view.cls
+    async_view.initkwargs = view.initkwargs
+    async_view.actions = view.actions
+    async_view.csrf_exempt = True
+    return async_view
+
+
+def async_read_urls(urlpatterns):
+    """
+    Заменяет представления ViewSet с кэшированием ответов на асинхронные.
+    """
+    return [
+        URLPattern(pattern.pattern, async_read_view(pattern.callback),
+                   pattern.default_args, pattern.name)
+        if issubclass(getattr(pattern.callback, 'cls', object),
+                      CachedResponseMixin)
+        else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,176 @@
+"""
+Данный модуль содержит пользовательские классы аутентификации
+для Django REST Framework.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class TokenUserCache:
+    """
+    Ограниченный по размеру LRU-кэш «токен -> пользователь» с временем
+    жизни записей.
+
+    Кэш локален для процесса. Записи пользователя удаляются при его
+    изменении или удалении (см. `api.signals`), а время жизни записи не
+    превышает ни срок действия токена, ни `JWT_USER_CACHE_MAX_TTL`.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                return None
+            expires_at, user, validated_token = entry
+            if expires_at <= time.monotonic():
+                self._remove(raw_token)
+                return None
+            self._entries.move_to_end(raw_token)
+        return copy.copy(user), validated_token
+
+    def set(self, raw_token, user, validated_token, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._remove(raw_token)
+            while len(self._entries) >= settings.JWT_USER_CACHE_SIZE:
+                self._remove(next(iter(self._entries)))
+            self._entries[raw_token] = (
+                time.monotonic() + ttl, copy.copy(user), validated_token)
+            self._tokens_by_user.setdefault(user.pk, set()).add(raw_token)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for raw_token in self._tokens_by_user.pop(user_id, ()):
+                self._entries.pop(raw_token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, raw_token):
+        entry = self._entries.pop(raw_token, None)
+        if entry is None:
+            return
+        user_id = entry[1].pk
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(raw_token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+token_user_cache = TokenUserCache()
+
+
+def get_token_user_id(header):
+    """
+    Возвращает идентификатор пользователя из значения заголовка
+    `Authorization` с действительным JWT-токеном или None.
+    """
+    parts = (header or '').split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(parts[1])[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+class CachingJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая запоминает проверенный токен и его
+    пользователя, чтобы не декодировать токен и не выполнять запрос
+    к `auth_user` на каждый запрос с тем же токеном.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        cached = token_user_cache.get(raw_token)
+        if cached is not None:
+            return cached
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        ttl = min(validated_token.get('exp', 0) - time.time(),
+                  settings.JWT_USER_CACHE_MAX_TTL)
+        token_user_cache.set(raw_token, user, validated_token, ttl)
+        return user, validated_token
+
+
+class TokenBackedUser(SimpleLazyObject):
+    """
+    Пользователь, построенный по утверждениям проверенного токена.
+
+    `pk`, `id` и `username` берутся из токена без обращения к БД. Полная
+    запись `User` загружается при первом обращении к любому другому
+    атрибуту, в том числе при сохранении пользователя в ForeignKey.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, validated_token, load_user):
+        self.__dict__['_token'] = validated_token
+        super().__init__(lambda: load_user(validated_token))
+
+    @property
+    def pk(self):
+        return self._token[api_settings.USER_ID_CLAIM]
+
+    id = pk
+
+    @property
+    def username(self):
+        if 'username' in self._token:
+            return self._token['username']
+        return super().__getattr__('username')
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к БД для безопасных
+    методов.
+
+    Подходит для эндпоинтов, которые на чтение используют только
+    идентификатор и имя пользователя. Запросы остальных методов
+    аутентифицируются `CachingJWTAuthentication`: пользователь
+    загружается (или берётся из кэша, который сбрасывается при изменении
+    пользователя) и проверяется до выполнения запроса, поэтому токен
+    деактивированного пользователя не позволяет изменять данные.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return CachingJWTAuthentication().authenticate(request)
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.')
+        return TokenBackedUser(validated_token, super().get_user)
@@ -0,0 +1,217 @@
+"""
+Данный модуль содержит ограниченный пул подключений к БД, общий для
+потоков процесса.
+
+Подключение Django потоконезависимо: без пула каждый поток открывает
+своё подключение, а при `CONN_MAX_AGE = 0` — заново на каждый запрос.
+Пул хранит не больше `MAX_SIZE` подключений, выдаёт свободные повторно и
+перед выдачей проверяет их запросом `SELECT 1`. Подключения старше
+`MAX_LIFETIME` секунд закрываются и заменяются новыми. Если все
+подключения заняты, поток ждёт освобождения не дольше `TIMEOUT` секунд.
+"""
+
+import time
+from collections import deque
+from threading import Condition, Lock
+
+
+class PoolTimeout(Exception):
+    """
+    Свободное подключение не появилось за время ожидания.
+    """
+
+
+class PooledConnection:
+    """
+    Подключение, выданное пулом.
+    """
+
+    def __init__(self, connection, pool):
+        self.connection = connection
+        self.pool = pool
+        self.created_at = time.monotonic()
+        self.reused = False
+
+
+def check_connection(connection):
+    """
+    Проверка работоспособности подключения по умолчанию.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул подключений с проверкой работоспособности и
+    максимальным временем жизни.
+
+    Счётчики `checked_out` (выдано), `waiting` (ждут подключения),
+    `created` и `closed` (открыто и закрыто за всё время) доступны
+    в `stats()`.
+    """
+
+    def __init__(self, max_size, max_lifetime=None, timeout=30,
+                 check=check_connection):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check = check
+        self.checked_out = 0
+        self.waiting = 0
+        self.created = 0
+        self.closed = 0
+        self.retired = False
+        self._idle = deque()
+        self._condition = Condition()
+
+    def acquire(self, connect):
+        """
+        Возвращает `PooledConnection`: свободное работоспособное
+        подключение или новое, открытое вызовом `connect()`.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while self.checked_out >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'Все {self.max_size} подключений пула заняты.')
+                self.waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.checked_out += 1
+
+        try:
+            while True:
+                with self._condition:
+                    if not self._idle:
+                        break
+                    # Последним возвращённое подключение, скорее всего,
+                    # ещё держит страницы БД в кэше.
+                    entry = self._idle.pop()
+                if self._is_usable(entry):
+                    entry.reused = True
+                    return entry
+                self._close(entry)
+
+            entry = PooledConnection(connect(), self)
+            with self._condition:
+                self.created += 1
+            return entry
+        except BaseException:
+            with self._condition:
+                self.checked_out -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, entry, discard=False):
+        """
+        Возвращает подключение в пул. Незавершённая транзакция
+        откатывается; устаревшее или неисправное подключение закрывается.
+        """
+        if not discard and not self.retired and not self._is_expired(entry):
+            try:
+                entry.connection.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+        if discard:
+            self._close(entry)
+        with self._condition:
+            if not discard:
+                self._idle.append(entry)
+            self.checked_out -= 1
+            self._condition.notify()
+
+    def close(self):
+        """
+        Закрывает свободные подключения. Выданные подключения будут
+        закрыты при возврате.
+        """
+        with self._condition:
+            self.retired = True
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'idle': len(self._idle),
+                'checked_out': self.checked_out,
+                'waiting': self.waiting,
+                'created': self.created,
+                'closed': self.closed,
+            }
+
+    def _is_expired(self, entry):
+        return (self.max_lifetime is not None
+                and time.monotonic() - entry.created_at >= self.max_lifetime)
+
+    def _is_usable(self, entry):
+        if self._is_expired(entry):
+            return False
+        try:
+            self.check(entry.connection)
+        except Exception:
+            return False
+        return True
+
+    def _close(self, entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self.closed += 1
+
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_pool(alias, name, max_size, max_lifetime=None, timeout=30):
+    """
+    Возвращает пул процесса для подключения `alias` к БД `name`.
+
+    Если у подключения сменилась БД (например, тестовая вместо рабочей),
+    прежний пул закрывается.
+    """
+    with _pools_lock:
+        name_and_pool = _pools.get(alias)
+        if name_and_pool is not None and name_and_pool[0] == name:
+            return name_and_pool[1]
+        pool = ConnectionPool(max_size, max_lifetime, timeout)
+        _pools[alias] = (name, pool)
+    if name_and_pool is not None:
+        name_and_pool[1].close()
+    return pool
+
+
+def pool_stats():
+    """
+    Возвращает метрики пулов процесса по именам подключений.
+    """
+    with _pools_lock:
+        pools = {alias: pool for alias, (name, pool) in _pools.items()}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    """
+    Закрывает и забывает все пулы процесса.
+    """
+    with _pools_lock:
+        pools = [pool for name, pool in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,61 @@
+"""
+Бэкенд SQLite, который берёт подключения из общего пула процесса
+(см. `api.backends.pool`).
+
+Параметры пула задаются ключом `POOL` описания БД в `DATABASES`:
+`MAX_SIZE`, `MAX_LIFETIME` и `TIMEOUT`. Закрытие подключения Django
+(в конце запроса при `CONN_MAX_AGE = 0` или по истечении
+`CONN_MAX_AGE`) возвращает его в пул, поэтому при постоянной нагрузке
+запросы не открывают новых подключений. БД в памяти пулом не
+обслуживается: её подключение нельзя закрывать.
+"""
+
+from django.db.backends.sqlite3 import base
+from django.utils.asyncio import async_unsafe
+
+from ..pool import PoolTimeout, get_pool
+
+Database = base.Database
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_entry = None
+        # Сообщает обработчикам `connection_created`, что подключение
+        # уже настроено при первом открытии.
+        self.connection_reused = False
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        return get_pool(
+            self.alias,
+            str(self.settings_dict['NAME']),
+            max_size=options.get('MAX_SIZE', 10),
+            max_lifetime=options.get('MAX_LIFETIME'),
+            timeout=options.get('TIMEOUT', 30),
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.connection_reused = False
+        if self.is_in_memory_db():
+            return super().get_new_connection(conn_params)
+        try:
+            self.pool_entry = self.get_pool().acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params))
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+        self.connection_reused = self.pool_entry.reused
+        return self.pool_entry.connection
+
+    def _close(self):
+        entry, self.pool_entry = self.pool_entry, None
+        if entry is None:
+            return super()._close()
+        # Подключение, закрытое внутри `atomic`, остаётся у обёртки до
+        # отката, поэтому отдавать его другим потокам нельзя.
+        with self.wrap_database_errors:
+            entry.pool.release(entry, discard=self.in_atomic_block)
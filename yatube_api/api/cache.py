@@ -0,0 +1,270 @@
+"""
+Данный модуль содержит кэширование ответов на GET-запросы к API.
+
+Ответы хранятся в кэше `settings.API_CACHE_ALIAS` (подходит любой бэкенд
+Django, например локальная память или файловый кэш). Ключ строится из
+пространства имён представления, его текущего поколения, видимости
+(анонимный или аутентифицированный запрос) и полного URL запроса.
+Сигналы моделей меняют поколение затронутых пространств имён (ещё раз —
+после фиксации транзакции), после чего старые записи становятся
+недоступны и вытесняются политикой кэша.
+
+Поколение также служит версией коллекции для условных GET-запросов:
+из него строятся заголовки `ETag` и `Last-Modified`, и на
+`If-None-Match`/`If-Modified-Since` ответ 304 отдаётся без обращения к БД.
+Поколения хранятся отдельно, в общем для всех процессов кэше
+`settings.API_GENERATION_CACHE_ALIAS`: запись в одном процессе должна
+менять версию во всех, даже если сами ответы кэшируются в памяти процесса.
+"""
+
+import hashlib
+import pickle
+import time
+from collections import Counter
+from threading import Lock
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from rest_framework.response import Response
+
+# Общие для всех потоков размеры записей и счётчики, по аналогии
+# с хранилищем `LocMemCache`.
+_sizes = {}
+_stats = Counter()
+_stats_lock = Lock()
+
+
+def _count(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+
+def get_cache_stats():
+    """
+    Возвращает счётчики попаданий, промахов и вытеснений кэша ответов.
+    """
+    with _stats_lock:
+        return {name: _stats[name] for name in ('hits', 'misses', 'evictions')}
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class LRUMemoryCache(LocMemCache):
+    """
+    Кэш в локальной памяти, ограниченный суммарным размером записей.
+
+    Размер задаётся параметром `OPTIONS['MAX_BYTES']` и считается по
+    длине сериализованных значений. При переполнении вытесняются давно
+    не использованные записи.
+    """
+    default_max_bytes = 16 * 1024 * 1024
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        options = params.get('OPTIONS', {})
+        self._max_bytes = int(
+            options.get('MAX_BYTES', self.default_max_bytes))
+        self._sizes = _sizes.setdefault(name, {'total': 0, 'keys': {}})
+
+    @property
+    def size(self):
+        return self._sizes['total']
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        size = len(key) + len(value)
+        if size > self._max_bytes:
+            self._delete(key)
+            return
+        self._delete(key)
+        while self._cache and (
+                self._sizes['total'] + size > self._max_bytes
+                or len(self._cache) >= self._max_entries):
+            self._evict_oldest()
+        super()._set(key, value, timeout)
+        self._sizes['keys'][key] = size
+        self._sizes['total'] += size
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        # Значение перезаписано в обход `_set`, пересчитываем его размер.
+        key = self.make_key(key, version=version)
+        with self._lock:
+            self._forget_size(key)
+            size = len(key) + len(pickle.dumps(value, self.pickle_protocol))
+            self._sizes['keys'][key] = size
+            self._sizes['total'] += size
+        return value
+
+    def _evict_oldest(self):
+        key, _ = self._cache.popitem()
+        self._expire_info.pop(key, None)
+        self._forget_size(key)
+        _count('evictions')
+
+    def _cull(self):
+        self._evict_oldest()
+
+    def _forget_size(self, key):
+        self._sizes['total'] -= self._sizes['keys'].pop(key, 0)
+
+    def _delete(self, key):
+        self._forget_size(key)
+        return super()._delete(key)
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self._sizes['keys'].clear()
+            self._sizes['total'] = 0
+
+
+def get_api_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_generation_cache():
+    return caches[settings.API_GENERATION_CACHE_ALIAS]
+
+
+def check_generation_cache(app_configs, **kwargs):
+    """
+    Предупреждает, если кэш поколений хранится в памяти процесса.
+    """
+    if isinstance(get_generation_cache(), LocMemCache):
+        return [checks.Warning(
+            'Кэш поколений ответов API хранится в памяти процесса: '
+            'изменения в других процессах не сбросят кэш ответов и '
+            'условные запросы получат устаревший ответ 304.',
+            hint='Укажите в API_GENERATION_CACHE_ALIAS общий кэш.',
+            id='api.W001',
+        )]
+    return []
+
+
+def _generation_key(namespace):
+    return f'api:generation:{namespace}'
+
+
+def _new_generation(previous=None):
+    """
+    Возвращает новое поколение. Его время строго больше времени
+    предыдущего поколения, даже если оба созданы в одну секунду: иначе
+    `If-Modified-Since` получил бы ответ 304 после изменения.
+    """
+    timestamp = int(time.time())
+    if previous is not None:
+        timestamp = max(timestamp, get_generation_timestamp(previous) + 1)
+    return f'{timestamp}.{uuid4().hex}'
+
+
+def get_generation(namespace):
+    """
+    Возвращает текущее поколение пространства имён.
+
+    Поколение — время изменения и случайная строка, а не счётчик: если
+    запись о поколении вытеснена из кэша, новое значение гарантированно
+    не совпадёт со старым и устаревшие ответы не будут выданы.
+    """
+    cache = get_generation_cache()
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_generation_timestamp(generation):
+    """
+    Возвращает время создания поколения в секундах.
+    """
+    return int(generation.split('.', 1)[0])
+
+
+def invalidate(*namespaces):
+    """
+    Делает недоступными все закэшированные ответы пространств имён.
+
+    Внутри транзакции поколения меняются ещё раз после её фиксации:
+    запрос, прочитавший до фиксации старые строки, сохранит ответ под
+    промежуточным поколением, которое сразу устареет.
+    """
+    def replace_generations():
+        cache = get_generation_cache()
+        keys = [_generation_key(namespace) for namespace in namespaces]
+        previous = cache.get_many(keys)
+        cache.set_many(
+            {key: _new_generation(previous.get(key)) for key in keys},
+            None,
+        )
+
+    replace_generations()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(replace_generations)
+
+
+class CachedResponseMixin:
+    """
+    Миксин для ViewSet, кэширующий ответы `list` и `retrieve` и
+    обрабатывающий условные GET-запросы.
+
+    Наследник определяет `get_cache_namespace()`; пространства имён
+    сбрасываются обработчиками сигналов в `api.signals`. Если поколение
+    уже прочитано (асинхронным представлением вне цикла событий, см.
+    `api.async_views`), оно передаётся в `cache_generation`.
+    """
+    cache_generation = None
+
+    def get_cache_namespace(self):
+        raise NotImplementedError
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        generation = self.cache_generation or get_generation(namespace)
+        visibility = 'auth' if request.user.is_authenticated else 'anon'
+        url = request.build_absolute_uri()
+
+        accept = request.META.get('HTTP_ACCEPT', '')
+        etag = 'W/"%s"' % hashlib.md5(
+            f'{generation}:{visibility}:{url}:{accept}'.encode()).hexdigest()
+        last_modified = get_generation_timestamp(generation)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cache = get_api_cache()
+        key = (f'api:response:{namespace}:{generation}:{visibility}:'
+               f'{hashlib.md5(url.encode()).hexdigest()}')
+        data = cache.get(key)
+        if data is not None:
+            _count('hits')
+            response = Response(data)
+        else:
+            _count('misses')
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,138 @@
+"""
+Данный модуль содержит брокер событий о новых постах и комментариях
+в памяти процесса.
+
+События публикуются обработчиками сигналов после фиксации транзакции
+(см. `api.signals`) из любого потока, а подписчики читают их в цикле
+событий ASGI (см. `api.stream`). У каждого подписчика своя очередь на
+`EVENT_STREAM_QUEUE_SIZE` событий; при переполнении по настройке
+`EVENT_STREAM_DROP_POLICY` либо отбрасываются самые старые события
+(`drop_oldest`), либо подписчик отключается (`disconnect`). Поэтому
+медленный клиент не увеличивает потребление памяти.
+"""
+
+import asyncio
+from collections import deque
+from itertools import count
+from threading import Lock
+
+from django.conf import settings
+
+DROP_OLDEST = 'drop_oldest'
+DISCONNECT = 'disconnect'
+
+
+class SubscriptionClosed(Exception):
+    """
+    Подписка закрыта: клиент отключён из-за переполнения очереди.
+    """
+
+
+class Subscription:
+    """
+    Ограниченная очередь событий одного подписчика.
+
+    Методы `push` и `close` вызываются из любого потока, `get` — только
+    в цикле событий, в котором создана подписка.
+    """
+
+    def __init__(self, predicate, maxsize, policy):
+        self.predicate = predicate
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._items = deque(maxlen=maxsize)
+        self._lock = Lock()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def push(self, event):
+        if not self.predicate(event):
+            return
+        with self._lock:
+            if self.closed:
+                return
+            if len(self._items) == self._items.maxlen:
+                if self.policy == DISCONNECT:
+                    self.closed = True
+                else:
+                    self.dropped += 1
+            if not self.closed:
+                self._items.append(event)
+            self._wake()
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._wake()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Цикл событий подписчика уже остановлен.
+            self.closed = True
+
+    async def get(self):
+        """
+        Возвращает следующее событие и число событий, отброшенных перед
+        ним.
+        """
+        while True:
+            with self._lock:
+                if self._items:
+                    dropped, self.dropped = self.dropped, 0
+                    return self._items.popleft(), dropped
+                if self.closed:
+                    raise SubscriptionClosed
+                # Сбрасываем флаг под блокировкой: следующий `push`
+                # установит его уже после сброса.
+                self._ready.clear()
+            await self._ready.wait()
+
+
+class EventBroker:
+    """
+    Рассылает события всем подписчикам процесса.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = Lock()
+        self._ids = count(1)
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, predicate=None):
+        """
+        Создаёт подписку в текущем цикле событий или возвращает None,
+        если подписчиков уже `EVENT_STREAM_MAX_SUBSCRIBERS`.
+        """
+        subscription = Subscription(
+            predicate or (lambda event: True),
+            settings.EVENT_STREAM_QUEUE_SIZE,
+            settings.EVENT_STREAM_DROP_POLICY,
+        )
+        with self._lock:
+            if len(self._subscriptions) >= (
+                    settings.EVENT_STREAM_MAX_SUBSCRIBERS):
+                return None
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type, **data):
+        if not self._subscriptions:
+            return
+        event = {'id': next(self._ids), 'type': event_type, **data}
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+broker = EventBroker()
@@ -0,0 +1,228 @@
+"""
+Данный модуль содержит быстрый путь сериализации списков для чтения.
+
+`ModelSerializer` для каждого поля каждого объекта вызывает
+`get_attribute` и `to_representation` полей DRF. `FastReadSerializer`
+один раз на запрос разбирает поля исходного сериализатора в пути для
+`values_list()` и функции преобразования значений, а затем строит
+словари прямо из строк результата запроса, не создавая объектов
+моделей. Результат совпадает с результатом исходного сериализатора
+(см. tests/test_fast_serializers.py); неподдерживаемое поле вызывает
+`ImproperlyConfigured` при разборе, а не расхождение в ответе.
+"""
+
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import (CommentSerializer, PostSerializer,
+                          build_image_srcset)
+
+# Поля, значение которых из БД уже совпадает с представлением DRF.
+PLAIN_FIELDS = (serializers.IntegerField, serializers.CharField,
+                serializers.BooleanField, serializers.ReadOnlyField)
+
+# Директивы `strftime`, которые можно заменить форматированием чисел.
+# `%Y` на Linux не дополняется нулями, поэтому годы до 1000 форматируются
+# через `strftime`.
+STRFTIME_DIRECTIVES = {
+    'Y': ('year', '%d'), 'm': ('month', '%02d'), 'd': ('day', '%02d'),
+    'H': ('hour', '%02d'), 'M': ('minute', '%02d'), 'S': ('second', '%02d'),
+}
+STRFTIME_DIRECTIVE_RE = re.compile(r'%(.)')
+
+
+def compile_strftime(output_format):
+    """
+    Возвращает функцию, которая форматирует дату как
+    `value.strftime(output_format)`, но без вызова `strftime`, или None,
+    если формат содержит другие директивы.
+    """
+    if '%' in STRFTIME_DIRECTIVE_RE.sub('', output_format):
+        return None
+    attrs = []
+
+    def replace(match):
+        if match[1] == '%':
+            return '%%'
+        attr, number_format = STRFTIME_DIRECTIVES[match[1]]
+        attrs.append(attr)
+        return number_format
+
+    try:
+        template = STRFTIME_DIRECTIVE_RE.sub(replace, output_format)
+    except KeyError:
+        return None
+
+    def strftime(value):
+        if value.year < 1000:
+            return value.strftime(output_format)
+        return template % tuple(getattr(value, attr) for attr in attrs)
+
+    return strftime
+
+
+def datetime_converter(field):
+    """
+    Повторяет `DateTimeField.to_representation` с часовым поясом и
+    форматом, вычисленными один раз.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    iso_8601 = output_format.lower() == ISO_8601
+    strftime = (compile_strftime(output_format)
+                or (lambda value: value.strftime(output_format)))
+
+    def convert(value):
+        if not value:
+            return None
+        aware = value.utcoffset() is not None
+        if field_timezone is not None:
+            if aware:
+                value = value.astimezone(field_timezone)
+            else:
+                value = field.enforce_timezone(value)
+        elif aware:
+            value = timezone.make_naive(value, timezone.utc)
+        if iso_8601:
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return strftime(value)
+
+    return convert
+
+
+def file_converter(field, model_field, request):
+    """
+    Повторяет `FileField.to_representation` для имени файла из БД.
+    """
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+    storage = model_field.storage
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    return convert
+
+
+class FastReadSerializer:
+    """
+    Сериализует строки `values_list()` так же, как `serializer_class`
+    сериализует объекты.
+
+    Для полей `SerializerMethodField` наследник задаёт в `method_fields`
+    пути значений, которые передаются методу `get_<поле>`.
+    """
+    serializer_class = None
+    method_fields = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.paths = []
+        self.accessors = []
+        serializer = self.serializer_class(context=self.context)
+        model = serializer.Meta.model
+        for field in serializer._readable_fields:
+            indexes, convert = self.compile(field, model)
+            if isinstance(field, serializers.SerializerMethodField):
+                self.accessors.append((field.field_name, None, indexes,
+                                       convert))
+            else:
+                self.accessors.append((field.field_name, indexes[0], None,
+                                       convert))
+
+    def add_path(self, path):
+        if path not in self.paths:
+            self.paths.append(path)
+        return self.paths.index(path)
+
+    def compile(self, field, model):
+        """
+        Возвращает индексы значений поля в строке и функцию
+        преобразования (None — значение отдаётся как есть).
+        """
+        name = field.field_name
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in self.method_fields:
+                raise ImproperlyConfigured(
+                    f'{type(self).__name__}.method_fields не содержит '
+                    f'поле {name}.')
+            indexes = [self.add_path(path)
+                       for path in self.method_fields[name]]
+            return indexes, getattr(self, f'get_{name}')
+
+        path = '__'.join(field.source_attrs)
+        if isinstance(field, serializers.SlugRelatedField):
+            return [self.add_path(f'{path}__{field.slug_field}')], None
+        if (isinstance(field, serializers.PrimaryKeyRelatedField)
+                and field.pk_field is None):
+            return [self.add_path(path)], None
+        if isinstance(field, serializers.DateTimeField):
+            return [self.add_path(path)], datetime_converter(field)
+        if isinstance(field, serializers.FileField):
+            model_field = model._meta.get_field(path)
+            return [self.add_path(path)], file_converter(
+                field, model_field, self.context.get('request'))
+        if isinstance(field, PLAIN_FIELDS) and len(field.source_attrs) == 1:
+            return [self.add_path(path)], None
+        raise ImproperlyConfigured(
+            f'Поле {name} ({type(field).__name__}) не поддерживается '
+            f'{type(self).__name__}.')
+
+    def get_queryset(self, queryset):
+        """
+        Возвращает строки с полями сериализатора. Строки — именованные
+        кортежи, поэтому пагинация может читать позицию курсора.
+        """
+        return queryset.values_list(*self.paths, named=True)
+
+    def serialize(self, rows):
+        """
+        Возвращает список словарей, как `serializer_class(many=True).data`.
+        """
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, indexes, convert in self.accessors:
+                if indexes is not None:
+                    item[name] = convert(*[row[i] for i in indexes])
+                    continue
+                value = row[index]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+class PostFastSerializer(FastReadSerializer):
+    serializer_class = PostSerializer
+    method_fields = {'image_srcset': ('image', 'image_variants')}
+
+    def __init__(self, context=None):
+        super().__init__(context)
+        self.image_storage = (
+            self.serializer_class.Meta.model._meta.get_field(
+                'image').storage)
+
+    def get_image_srcset(self, image, image_variants):
+        if not image:
+            return None
+        return build_image_srcset(self.image_storage, image, image_variants,
+                                  self.context.get('request'))
+
+
+class CommentFastSerializer(FastReadSerializer):
+    serializer_class = CommentSerializer
@@ -0,0 +1,129 @@
+"""
+Данный модуль содержит стратегии построения ленты подписок.
+
+Стратегия выбирается настройкой `FEED_STRATEGY`:
+
+* `FanOutOnReadStrategy` — лента строится одним запросом по подпискам
+  в момент чтения;
+* `FanOutOnWriteStrategy` — при публикации пост раскладывается в
+  предвычисленные ленты подписчиков (`TimelineEntry`);
+* `HybridStrategy` — раскладывает при записи посты авторов, у которых не
+  больше `FEED_FANOUT_MAX_FOLLOWERS` подписчиков, а посты популярных
+  авторов добирает при чтении, чтобы избежать усиления записи.
+
+Разложенные посты отмечаются `Post.fanned_out`. `HybridStrategy` добирает
+при чтении все неразложенные посты, поэтому посты, опубликованные, пока
+автор был популярен, не пропадают из ленты, когда подписчиков у него
+становится меньше порога.
+"""
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from posts.models import Follow, Post, Profile, TimelineEntry
+
+
+class FanOutOnReadStrategy:
+    """
+    Лента строится в момент чтения по индексу подписок.
+    """
+
+    def get_queryset(self, user):
+        return Post.objects.filter(
+            author__in=Follow.objects.filter(user=user).values('following'))
+
+    def publish(self, post):
+        pass
+
+    def follow(self, follow):
+        pass
+
+    def unfollow(self, follow):
+        pass
+
+
+class FanOutOnWriteStrategy:
+    """
+    Лента заранее раскладывается по подписчикам при публикации поста.
+    """
+
+    def get_queryset(self, user):
+        return Post.objects.filter(timeline_entries__user=user)
+
+    def publish(self, post):
+        followers = Follow.objects.filter(
+            following_id=post.author_id).values_list('user_id', flat=True)
+        TimelineEntry.objects.bulk_create(
+            (TimelineEntry(user_id=user_id, post=post)
+             for user_id in followers.iterator()),
+            ignore_conflicts=True,
+        )
+        Post.objects.filter(pk=post.pk).update(fanned_out=True)
+        post.fanned_out = True
+
+    def get_followed_posts(self, follow):
+        """
+        Возвращает посты автора, которые нужно добавить в ленту нового
+        подписчика.
+        """
+        return Post.objects.filter(author_id=follow.following_id)
+
+    def follow(self, follow):
+        posts = self.get_followed_posts(follow).values_list('id', flat=True)
+        TimelineEntry.objects.bulk_create(
+            (TimelineEntry(user_id=follow.user_id, post_id=post_id)
+             for post_id in posts.iterator()),
+            ignore_conflicts=True,
+        )
+
+    def unfollow(self, follow):
+        TimelineEntry.objects.filter(
+            user_id=follow.user_id,
+            post__author_id=follow.following_id,
+        ).delete()
+
+
+class HybridStrategy(FanOutOnWriteStrategy):
+    """
+    Выбирает раскладку при записи или при чтении по числу подписчиков
+    автора из `Profile.followers_count`.
+
+    Решение принимается для каждого поста при публикации: при чтении
+    добираются неразложенные посты (`fanned_out=False`) авторов подписок,
+    а новому подписчику раскладываются разложенные ранее посты автора,
+    даже если сейчас он популярен.
+    """
+
+    def __init__(self, max_followers=None):
+        if max_followers is None:
+            max_followers = settings.FEED_FANOUT_MAX_FOLLOWERS
+        self.max_followers = max_followers
+
+    def is_heavy(self, author_id):
+        return Profile.objects.filter(
+            user_id=author_id,
+            followers_count__gt=self.max_followers,
+        ).exists()
+
+    def get_queryset(self, user):
+        return Post.objects.filter(
+            Q(id__in=TimelineEntry.objects.filter(user=user).values('post'))
+            | Q(fanned_out=False,
+                author__in=Follow.objects.filter(user=user).values(
+                    'following'))
+        )
+
+    def publish(self, post):
+        if not self.is_heavy(post.author_id):
+            super().publish(post)
+
+    def get_followed_posts(self, follow):
+        return super().get_followed_posts(follow).filter(fanned_out=True)
+
+
+def get_feed_strategy():
+    """
+    Возвращает экземпляр стратегии ленты из настройки `FEED_STRATEGY`.
+    """
+    return import_string(settings.FEED_STRATEGY)()
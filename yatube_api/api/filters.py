@@ -0,0 +1,142 @@
+"""
+Данный модуль содержит фильтрацию постов по группе, автору и дате
+публикации.
+
+Слаг группы и имя автора переводятся в идентификаторы через небольшой
+кэш процесса, поэтому фильтр выполняется одним запросом по индексам
+`(group, pub_date, id)` и `(author, pub_date, id)` без соединения таблиц.
+"""
+
+import datetime
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from posts.models import Group, User
+
+
+class LookupCache:
+    """
+    Ограниченный по размеру LRU-кэш «значение -> идентификатор» с
+    временем жизни записей `POST_FILTER_CACHE_TTL`.
+
+    Кэшируются только найденные значения. Кэш сбрасывается при изменении
+    или удалении объектов (см. `api.signals`), а в других процессах
+    устаревшая запись живёт не дольше времени жизни.
+    """
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, value):
+        with self._lock:
+            entry = self._entries.get(value)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(value)
+                return entry[1]
+
+        pk = self.queryset.filter(
+            **{self.field: value}).values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        with self._lock:
+            self._entries[value] = (
+                time.monotonic() + settings.POST_FILTER_CACHE_TTL, pk)
+            self._entries.move_to_end(value)
+            while len(self._entries) > settings.POST_FILTER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+        return pk
+
+    def discard(self, pk):
+        with self._lock:
+            for value, entry in list(self._entries.items()):
+                if entry[1] == pk:
+                    del self._entries[value]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+group_slug_cache = LookupCache(Group.objects.all(), 'slug')
+username_cache = LookupCache(User.objects.all(), 'username')
+
+
+class PostFilterBackend(BaseFilterBackend):
+    """
+    Фильтрует посты по параметрам:
+
+    * `group` — идентификатор или слаг группы. Значение из одних цифр
+      всегда считается идентификатором: группу с цифровым слагом можно
+      отфильтровать только по её идентификатору. Идентификатор вне
+      диапазона `BigAutoField` даёт пустой результат;
+    * `author` — имя автора;
+    * `since`, `until` — границы даты публикации включительно; дата без
+      времени означает весь день.
+    """
+    invalid_date_message = 'Укажите дату в формате ISO 8601.'
+    max_id = 2 ** 63 - 1
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        group = params.get('group')
+        if group is not None:
+            group_id = (int(group) if group.isdecimal()
+                        else group_slug_cache.get(group))
+            if group_id is None or group_id > self.max_id:
+                return queryset.none()
+            queryset = queryset.filter(group_id=group_id)
+
+        author = params.get('author')
+        if author is not None:
+            author_id = username_cache.get(author)
+            if author_id is None:
+                return queryset.none()
+            queryset = queryset.filter(author_id=author_id)
+
+        since = params.get('since')
+        if since is not None:
+            queryset = queryset.filter(
+                pub_date__gte=self.parse(since, 'since'))
+
+        until = params.get('until')
+        if until is not None:
+            end = self.parse(until, 'until', upper=True)
+            queryset = queryset.filter(pub_date__lt=end)
+        return queryset
+
+    def parse(self, value, param, upper=False):
+        """
+        Возвращает момент времени для границы `since` или исключающую
+        верхнюю границу для `until`.
+        """
+        try:
+            moment = parse_datetime(value)
+            day = None if moment else parse_date(value)
+        except ValueError:
+            moment = day = None
+        if moment is None and day is None:
+            raise ValidationError({param: self.invalid_date_message})
+
+        if moment is not None:
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            if upper:
+                moment += datetime.timedelta(microseconds=1)
+            return moment
+
+        if upper:
+            day += datetime.timedelta(days=1)
+        return timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time.min))
@@ -0,0 +1,58 @@
+"""
+Данный модуль содержит кэш сообществ в памяти процесса.
+
+Сообщества меняются редко, а читаются при каждом запросе к `/groups/`,
+поэтому все они загружаются одним запросом и хранятся в процессе до
+смены поколения пространства имён `groups` (см. `api.cache`), но не
+дольше `GROUP_CACHE_TTL` секунд. Поколение меняется сигналами сохранения
+и удаления `Group`. Если кэш поколений `API_GENERATION_CACHE_ALIAS` общий
+для процессов, изменение в одном процессе сбрасывает кэш и в остальных;
+иначе, как и при изменении в обход сигналов, устаревшие сообщества
+отдаются не дольше времени жизни.
+"""
+
+import time
+from threading import Lock
+
+from django.conf import settings
+
+from posts.models import Group
+
+from .cache import get_generation
+
+
+class GroupCache:
+    """
+    Все сообщества по идентификатору, загруженные для текущего
+    поколения `groups` не раньше `GROUP_CACHE_TTL` секунд назад.
+    """
+
+    def __init__(self):
+        self._generation = None
+        self._expires = 0
+        self._groups = {}
+        self._lock = Lock()
+
+    def get_all(self):
+        generation = get_generation('groups')
+        with self._lock:
+            if (generation != self._generation
+                    or self._expires <= time.monotonic()):
+                self._groups = {
+                    group.pk: group for group in Group.objects.order_by('pk')
+                }
+                self._generation = generation
+                self._expires = time.monotonic() + settings.GROUP_CACHE_TTL
+            return self._groups
+
+    def get(self, pk):
+        return self.get_all().get(pk)
+
+    def clear(self):
+        with self._lock:
+            self._generation = None
+            self._expires = 0
+            self._groups = {}
+
+
+group_cache = GroupCache()
@@ -0,0 +1,174 @@
+"""
+Данный модуль содержит фоновую генерацию уменьшенных копий изображений
+постов.
+
+После сохранения поста с новым изображением задача ставится в пул
+потоков и создаёт копии шириной `IMAGE_DERIVATIVE_WIDTHS` в форматах
+`IMAGE_DERIVATIVE_FORMATS`. Имена готовых файлов записываются в
+`Post.image_variants`; до этого сериализатор отдаёт оригинал.
+
+Изображения хранятся по хэшу содержимого и разделяются между постами,
+поэтому файл удаляется, только когда на него не осталось ссылок. Копии
+лежат в каталоге, названном по хэшу оригинала: одинаковые копии разных
+оригиналов (например, отличающихся только метаданными) хранятся
+отдельно и удаляются вместе со своим оригиналом.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+
+from PIL import Image, ImageOps
+
+from posts.models import Post
+
+from .cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    'jpeg': 'jpg',
+    'webp': 'webp',
+}
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                thread_name_prefix='image-derivatives',
+            )
+        return _executor
+
+
+def schedule_derivatives(post_id):
+    """
+    Ставит генерацию копий в очередь после фиксации транзакции.
+    """
+    def submit():
+        if settings.IMAGE_DERIVATIVES_ASYNC:
+            get_executor().submit(_run_in_worker, post_id)
+        else:
+            generate_derivatives(post_id)
+
+    transaction.on_commit(submit)
+
+
+def _run_in_worker(post_id):
+    close_old_connections()
+    try:
+        generate_derivatives(post_id)
+    except Exception:
+        logger.exception('Не удалось создать копии изображения поста %s',
+                         post_id)
+    finally:
+        close_old_connections()
+
+
+def _encode(image, image_format):
+    if image_format == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format,
+               quality=settings.IMAGE_DERIVATIVE_QUALITY)
+    return buffer.getvalue()
+
+
+def derivative_directory(source):
+    """
+    Возвращает каталог копий изображения `source`.
+    """
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(settings.IMAGE_DERIVATIVE_PATH, stem)
+
+
+def generate_derivatives(post_id):
+    """
+    Создаёт уменьшенные копии изображения поста и сохраняет их имена.
+    """
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    source = post.image.name
+    storage = post.image.storage
+    directory = derivative_directory(source)
+
+    # Файлы адресуются по содержимому, поэтому копии одинаковых
+    # изображений можно взять у другого поста.
+    shared = Post.objects.filter(image=source).exclude(pk=post_id)
+    for image_variants in shared.values_list('image_variants', flat=True):
+        if image_variants.get('source') == source:
+            _store_variants(post_id, source, image_variants['variants'])
+            return
+
+    with storage.open(source) as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+
+    variants = {}
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        if width > original.width:
+            continue
+        resized = original.copy()
+        resized.thumbnail((width, original.height), Image.Resampling.LANCZOS)
+        for image_format in settings.IMAGE_DERIVATIVE_FORMATS:
+            name = storage.save(
+                os.path.join(
+                    directory,
+                    f'{width}.{FORMAT_EXTENSIONS[image_format]}',
+                ),
+                ContentFile(_encode(resized, image_format)),
+            )
+            variants.setdefault(image_format, {})[str(width)] = name
+
+    _store_variants(post_id, source, variants)
+
+
+def _store_variants(post_id, source, variants):
+    # Обновляем, только если изображение не сменилось за время работы.
+    updated = Post.objects.filter(pk=post_id, image=source).update(
+        image_variants={'source': source, 'variants': variants})
+    if updated:
+        invalidate('posts', f'posts:{post_id}')
+
+
+def release_image(name, image_variants=None):
+    """
+    Удаляет файл изображения и его копии после фиксации транзакции,
+    если на изображение больше не ссылается ни один пост.
+    """
+    def release():
+        if not name:
+            return
+        storage = Post._meta.get_field('image').storage
+        # Под блокировкой: загрузка такого же файла восстановит его
+        # после своей фиксации (см. `ContentAddressedStorage`).
+        with storage.lock(name):
+            if Post.objects.filter(image=name).exists():
+                return
+            names = [name]
+            if image_variants and image_variants.get('source') == name:
+                # Копии вне каталога оригинала могут принадлежать другим
+                # изображениям.
+                directory = derivative_directory(name) + os.sep
+                names.extend(
+                    variant
+                    for widths in image_variants['variants'].values()
+                    for variant in widths.values()
+                    if variant.startswith(directory)
+                )
+            for stored_name in names:
+                storage.delete(stored_name)
+
+    transaction.on_commit(release)
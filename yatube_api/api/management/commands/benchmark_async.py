@@ -0,0 +1,141 @@
+"""
+Команда сравнения синхронного и асинхронного пути чтения API под
+нагрузкой.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from api.async_views import async_read_urls
+from api.urls import router_v1
+from posts.models import Post, User
+
+
+class SyncURLConf:
+    urlpatterns = [
+        path('api/v1/', include((router_v1.urls, 'api'))),
+    ]
+
+
+class AsyncURLConf:
+    urlpatterns = [
+        path('api/v1/', include((async_read_urls(router_v1.urls), 'api'))),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Создаёт посты, выполняет одинаковую смесь GET-запросов '
+            'тестовым клиентом WSGI из пула потоков и тестовым клиентом '
+            'ASGI из цикла событий, сравнивает пропускную способность и '
+            'задержки и удаляет созданные данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument(
+            '--concurrency', type=int, default=200,
+            help='Число одновременных клиентов: потоков для WSGI и задач '
+                 'для ASGI.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, posts, requests, concurrency, seed, **options):
+        # Потоки клиентов видят только зафиксированные данные, поэтому
+        # посты не откатываются, а удаляются в конце.
+        author = User.objects.create(
+            username=f'async-benchmark-{uuid4().hex[:8]}')
+        try:
+            Post.objects.bulk_create(
+                Post(author=author, text=f'Пост {number}')
+                for number in range(posts))
+            post_ids = list(Post.objects.filter(
+                author=author).values_list('id', flat=True))
+            rng = random.Random(seed)
+            urls = [
+                '/api/v1/posts/' if rng.random() < 0.5
+                else f'/api/v1/posts/{rng.choice(post_ids)}/'
+                for _ in range(requests)
+            ]
+            self.stdout.write(
+                f'Постов: {posts}, запросов: {requests}, одновременных '
+                f'клиентов: {concurrency}, различных URL: {len(set(urls))}.')
+
+            allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+            with override_settings(ROOT_URLCONF=SyncURLConf,
+                                   ALLOWED_HOSTS=allowed_hosts):
+                self.report('WSGI', *self.run_sync(urls, concurrency))
+            with override_settings(ROOT_URLCONF=AsyncURLConf,
+                                   ALLOWED_HOSTS=allowed_hosts):
+                self.report('ASGI', *asyncio.run(
+                    self.run_async(urls, concurrency)))
+        finally:
+            author.delete()
+
+    def run_sync(self, urls, concurrency):
+        """
+        Выполняет запросы тестовым клиентом WSGI из `concurrency` потоков.
+        """
+        def worker(chunk):
+            client = Client()
+            timings = []
+            try:
+                for url in chunk:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            return timings
+
+        # Первый проход заполняет кэш ответов.
+        worker(sorted(set(urls)))
+        chunks = [urls[start::concurrency] for start in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, chunks))
+        return time.perf_counter() - started, [
+            timing for timings in results for timing in timings]
+
+    async def run_async(self, urls, concurrency):
+        """
+        Выполняет запросы тестовым клиентом ASGI из `concurrency` задач
+        цикла событий.
+        """
+        async def worker(chunk):
+            client = AsyncClient()
+            timings = []
+            for url in chunk:
+                started = time.perf_counter()
+                await client.get(url)
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        try:
+            await worker(sorted(set(urls)))
+            chunks = [urls[start::concurrency]
+                      for start in range(concurrency)]
+            started = time.perf_counter()
+            results = await asyncio.gather(*map(worker, chunks))
+            elapsed = time.perf_counter() - started
+        finally:
+            await sync_to_async(connections.close_all)()
+        return elapsed, [timing for timings in results for timing in timings]
+
+    def report(self, name, elapsed, timings):
+        timings.sort()
+        self.stdout.write(
+            f'{name}: {len(timings) / elapsed:.0f} запросов/с, задержка: '
+            f'медиана {statistics.median(timings) * 1000:.1f} мс, p95 '
+            f'{timings[int(len(timings) * 0.95)] * 1000:.1f} мс.')
@@ -0,0 +1,86 @@
+"""
+Команда сравнения `JWTAuthentication` и `CachingJWTAuthentication` на
+запросах с одним токеном.
+"""
+
+import time
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachingJWTAuthentication, token_user_cache
+from posts.models import User
+
+
+class Rollback(Exception):
+    """
+    Откатывает транзакцию с данными замера.
+    """
+
+
+class MeView(APIView):
+    """
+    Минимальное представление: в ответе только идентификатор
+    пользователя, поэтому время запроса определяется аутентификацией.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        return Response({'id': request.user.pk})
+
+
+class Command(BaseCommand):
+    help = ('Создаёт в транзакции пользователя, выполняет запросы с его '
+            'JWT-токеном с аутентификацией `JWTAuthentication` и '
+            '`CachingJWTAuthentication`, выводит число запросов в секунду '
+            'и запросов к БД и откатывает транзакцию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000)
+
+    def handle(self, *args, requests, **options):
+        try:
+            with transaction.atomic():
+                self.run(requests)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, requests):
+        user = User.objects.create(
+            username=f'auth-benchmark-{uuid4().hex[:8]}')
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        for authentication_class in (JWTAuthentication,
+                                     CachingJWTAuthentication):
+            view = MeView.as_view(
+                authentication_classes=(authentication_class,))
+            token_user_cache.clear()
+            queries.clear()
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                for _ in range(requests):
+                    response = view(request)
+                elapsed = time.perf_counter() - started
+            if response.data != {'id': user.pk}:
+                raise CommandError(
+                    f'{authentication_class.__name__} не аутентифицировал '
+                    'пользователя.')
+            self.stdout.write(
+                f'{authentication_class.__name__}: '
+                f'{requests / elapsed:.0f} запросов/с, запросов к БД: '
+                f'{len(queries)}.')
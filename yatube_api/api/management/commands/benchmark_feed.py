@@ -0,0 +1,154 @@
+"""
+Команда сравнения стратегий ленты подписок на синтетических данных.
+"""
+
+import itertools
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from posts.models import Follow, Post, Profile, TimelineEntry, User
+
+STRATEGIES = (
+    'api.feed.FanOutOnReadStrategy',
+    'api.feed.FanOutOnWriteStrategy',
+    'api.feed.HybridStrategy',
+)
+
+
+class Rollback(Exception):
+    """
+    Откатывает транзакцию с данными замера.
+    """
+
+
+class Command(BaseCommand):
+    help = ('Создаёт в транзакции пользователей, подписки и посты, '
+            'замеряет публикацию и чтение ленты каждой стратегией '
+            '`api.feed` и откатывает транзакцию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument(
+            '--follows', type=int, default=50,
+            help='Число подписок каждого пользователя. Авторы выбираются '
+                 'по закону Ципфа, поэтому у немногих авторов много '
+                 'подписчиков.',
+        )
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument(
+            '--readers', type=int, default=200,
+            help='Число пользователей, чья лента читается.',
+        )
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, users, follows, posts, readers, page_size,
+               seed, **options):
+        if follows >= users:
+            raise CommandError('--follows должно быть меньше --users.')
+        self.random = random.Random(seed)
+        try:
+            with transaction.atomic():
+                self.run(users, follows, posts, readers, page_size)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, users, follows, posts, readers, page_size):
+        user_ids = self.create_users(users)
+        follow_count = self.create_follows(user_ids, follows)
+        post_list = self.create_posts(user_ids, posts)
+        reader_ids = self.random.sample(user_ids, min(readers, users))
+        self.stdout.write(
+            f'Пользователей: {users}, подписок: {follow_count}, '
+            f'постов: {len(post_list)}, порог раскладки: '
+            f'{settings.FEED_FANOUT_MAX_FOLLOWERS} подписчиков.')
+
+        feeds = {}
+        for path in STRATEGIES:
+            strategy = import_string(path)()
+            TimelineEntry.objects.filter(post__in=post_list).delete()
+            Post.objects.filter(pk__in=[post.pk for post in post_list]
+                                ).update(fanned_out=False)
+
+            started = time.perf_counter()
+            for post in post_list:
+                strategy.publish(post)
+            publish_time = time.perf_counter() - started
+            entries = TimelineEntry.objects.filter(post__in=post_list).count()
+
+            timings = []
+            for user_id in reader_ids:
+                started = time.perf_counter()
+                feed = list(
+                    strategy.get_queryset(User(pk=user_id))
+                    .order_by('-pub_date', '-id')
+                    .values_list('id', flat=True)[:page_size])
+                timings.append(time.perf_counter() - started)
+                feeds.setdefault(user_id, {})[path] = feed
+
+            timings.sort()
+            self.stdout.write(
+                f'{path}: публикация {publish_time:.3f} с '
+                f'({entries} записей лент), чтение ленты: медиана '
+                f'{statistics.median(timings) * 1000:.2f} мс, p95 '
+                f'{timings[int(len(timings) * 0.95)] * 1000:.2f} мс.')
+
+        mismatches = [user_id for user_id, results in feeds.items()
+                      if len(set(map(tuple, results.values()))) > 1]
+        if mismatches:
+            raise CommandError(
+                f'Ленты {len(mismatches)} пользователей различаются '
+                'между стратегиями.')
+
+    def create_users(self, count):
+        prefix = f'feed-benchmark-{uuid4().hex[:8]}-'
+        User.objects.bulk_create(
+            (User(username=f'{prefix}{number}') for number in range(count)),
+            batch_size=1000,
+        )
+        return list(User.objects.filter(
+            username__startswith=prefix).values_list('id', flat=True))
+
+    def create_follows(self, user_ids, follows):
+        weights = list(itertools.accumulate(
+            1 / rank for rank in range(1, len(user_ids) + 1)))
+        authors = user_ids[:]
+        self.random.shuffle(authors)
+        followers_count = dict.fromkeys(user_ids, 0)
+        rows = []
+        for user_id in user_ids:
+            following = set()
+            while len(following) < follows:
+                following.update(
+                    author for author in self.random.choices(
+                        authors, cum_weights=weights, k=follows)
+                    if author != user_id)
+            for author in itertools.islice(following, follows):
+                followers_count[author] += 1
+                rows.append(Follow(user_id=user_id, following_id=author))
+        Follow.objects.bulk_create(rows, batch_size=5000)
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_id, following_count=follows,
+                     followers_count=followers_count[user_id])
+             for user_id in user_ids),
+            batch_size=5000,
+        )
+        return len(rows)
+
+    def create_posts(self, user_ids, count):
+        Post.objects.bulk_create(
+            (Post(author_id=self.random.choice(user_ids),
+                  text=f'Пост {number}')
+             for number in range(count)),
+            batch_size=1000,
+        )
+        return list(Post.objects.filter(author_id__in=user_ids)
+                    .order_by('id').only('id', 'author_id'))
@@ -0,0 +1,89 @@
+"""
+Команда сравнения `FastJSONRenderer` и `JSONRenderer` на списке постов.
+"""
+
+import statistics
+import time
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.fast_serializers import PostFastSerializer
+from api.renderers import FastJSONRenderer
+from posts.models import Group, Post, User
+
+
+class Rollback(Exception):
+    """
+    Откатывает транзакцию с данными замера.
+    """
+
+
+class Command(BaseCommand):
+    help = ('Создаёт в транзакции посты, сериализует их список и замеряет '
+            'отрисовку в JSON рендерерами `JSONRenderer` и '
+            '`FastJSONRenderer`, после чего откатывает транзакцию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число повторов отрисовки; выводится медиана.',
+        )
+
+    def handle(self, *args, posts, repeat, **options):
+        if renderers.orjson is None:
+            self.stdout.write('Пакет orjson не установлен: '
+                              '`FastJSONRenderer` совпадает с `JSONRenderer`.')
+        try:
+            with transaction.atomic():
+                self.run(posts, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, repeat):
+        data = self.serialize_posts(posts)
+        results = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                content = renderer.render(data)
+                timings.append(time.perf_counter() - started)
+            results[type(renderer).__name__] = content
+            self.stdout.write(
+                f'{type(renderer).__name__}: медиана '
+                f'{statistics.median(timings) * 1000:.1f} мс, '
+                f'{len(content) / 1024:.0f} КиБ.')
+        if len(set(results.values())) > 1:
+            raise CommandError('Ответы рендереров различаются.')
+
+    def serialize_posts(self, count):
+        """
+        Создаёт `count` постов и возвращает их список так же, как
+        `PostViewSet.list`.
+        """
+        author = User.objects.create(
+            username=f'json-benchmark-{uuid4().hex[:8]}')
+        group = Group.objects.create(
+            title='Сообщество замера', slug=f'json-benchmark-{uuid4().hex}',
+            description='Сообщество для замера отрисовки JSON.')
+        Post.objects.bulk_create(
+            (Post(author=author, group=group if number % 2 else None,
+                  text=f'Пост {number} с "кавычками" и юникодом: ё, ☃.')
+             for number in range(count)),
+            batch_size=1000,
+        )
+        serializer = PostFastSerializer()
+        started = time.perf_counter()
+        data = serializer.serialize(serializer.get_queryset(
+            Post.objects.filter(author=author).order_by('-pub_date', '-id')))
+        self.stdout.write(
+            f'Сериализовано постов: {len(data)} за '
+            f'{(time.perf_counter() - started) * 1000:.1f} мс.')
+        return data
@@ -0,0 +1,118 @@
+"""
+Команда сравнения полнотекстового поиска постов с поиском `icontains`.
+"""
+
+import itertools
+import random
+import statistics
+import string
+import time
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+
+from api.search import SimpleSearchBackend, SQLiteFTS5Backend
+from posts.models import Post, User
+
+
+class Rollback(Exception):
+    """
+    Откатывает транзакцию с данными замера.
+    """
+
+
+class Command(BaseCommand):
+    help = ('Создаёт в транзакции посты со случайным текстом, замеряет '
+            'поиск по индексу FTS5 и поиск `icontains` и откатывает '
+            'транзакцию.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--words', type=int, default=12,
+                            help='Число слов в тексте поста.')
+        parser.add_argument(
+            '--vocabulary', type=int, default=20000,
+            help='Размер словаря. Слова выбираются по закону Ципфа.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Число повторов каждого запроса; выводится медиана.',
+        )
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, posts, words, vocabulary, repeat, page_size,
+               seed, **options):
+        if connections[router.db_for_write(Post)].vendor != 'sqlite':
+            raise CommandError('Индекс FTS5 доступен только в SQLite.')
+        self.random = random.Random(seed)
+        try:
+            with transaction.atomic():
+                self.run(posts, words, vocabulary, repeat, page_size)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, words, vocabulary, repeat, page_size):
+        dictionary = self.make_vocabulary(vocabulary)
+        started = time.perf_counter()
+        self.create_posts(posts, words, dictionary)
+        self.stdout.write(f'Создано постов: {posts} за '
+                          f'{time.perf_counter() - started:.1f} с.')
+
+        fts = SQLiteFTS5Backend()
+        started = time.perf_counter()
+        fts.rebuild()
+        self.stdout.write(f'Индекс FTS5 построен за '
+                          f'{time.perf_counter() - started:.1f} с.')
+
+        # Частые, средние и редкие слова и запросы из двух слов.
+        queries = [dictionary[rank] for rank in (0, 100, 5000)
+                   if rank < len(dictionary)]
+        queries += [f'{queries[0]} {query}' for query in queries[1:]]
+        backends = (fts, SimpleSearchBackend())
+        for query in queries:
+            matches = fts.search(Post.objects.all(), query).count()
+            self.stdout.write(f'Запрос «{query}» ({matches} совпадений):')
+            for backend in backends:
+                queryset = backend.search(Post.objects.all(), query)
+                page = self.measure(
+                    lambda: list(queryset.values_list(
+                        'id', flat=True)[:page_size]), repeat)
+                count = self.measure(queryset.count, repeat)
+                self.stdout.write(
+                    f'  {type(backend).__name__}: страница {page * 1000:.1f} '
+                    f'мс, COUNT(*) {count * 1000:.1f} мс')
+
+    def measure(self, function, repeat):
+        """
+        Возвращает медиану времени вызова `function` в секундах.
+        """
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def make_vocabulary(self, size):
+        dictionary = set()
+        while len(dictionary) < size:
+            dictionary.add(''.join(self.random.choices(
+                string.ascii_lowercase, k=self.random.randint(4, 10))))
+        dictionary = sorted(dictionary)
+        self.random.shuffle(dictionary)
+        return dictionary
+
+    def create_posts(self, count, words, dictionary, batch_size=10000):
+        author = User.objects.create(
+            username=f'search-benchmark-{uuid4().hex[:8]}')
+        weights = list(itertools.accumulate(
+            1 / rank for rank in range(1, len(dictionary) + 1)))
+        for start in range(0, count, batch_size):
+            Post.objects.bulk_create(
+                Post(author=author, text=' '.join(self.random.choices(
+                    dictionary, cum_weights=weights, k=words)))
+                for _ in range(min(batch_size, count - start))
+            )
@@ -0,0 +1,172 @@
+"""
+Команда сравнения конкурентного чтения и записи SQLite с настройками по
+умолчанию и с настройками производственного профиля БД.
+"""
+
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Создаёт во временном файле SQLite таблицы постов, запускает '
+            'потоки записи и чтения сначала с настройками SQLite по '
+            'умолчанию, затем с WAL, настройками `SQLITE_PRODUCTION_PRAGMAS` '
+            'и чтением через подключение только для чтения, и сравнивает '
+            'пропускную способность.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=5,
+                            help='Длительность замера в секундах.')
+        parser.add_argument(
+            '--posts', type=int, default=10000,
+            help='Число постов в таблице перед замером.',
+        )
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, writers, readers, duration, posts, page_size,
+               **options):
+        profiles = (
+            ('По умолчанию', {}, False),
+            ('Производственный профиль',
+             {'journal_mode': 'WAL', **settings.SQLITE_PRODUCTION_PRAGMAS},
+             True),
+        )
+        self.stdout.write(f'Потоков записи: {writers}, чтения: {readers}, '
+                          f'длительность: {duration} с.')
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (name, pragmas, read_only) in enumerate(profiles):
+                path = Path(directory) / f'benchmark-{number}.sqlite3'
+                aliases = self.add_databases(path, pragmas, read_only)
+                try:
+                    self.run(name, *aliases, writers, readers, duration,
+                             posts, page_size)
+                finally:
+                    self.remove_databases(aliases)
+
+    def add_databases(self, path, pragmas, read_only):
+        """
+        Добавляет подключения к файлу `path` и возвращает псевдонимы
+        подключений для записи и для чтения.
+        """
+        alias = f'benchmark-{uuid4().hex[:8]}'
+        connections.databases[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(path),
+            'PRAGMAS': pragmas,
+        }
+        if not read_only:
+            return alias, alias
+        reader_pragmas = {name: value for name, value in pragmas.items()
+                          if name != 'journal_mode'}
+        connections.databases[f'{alias}-reader'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{path}?mode=ro',
+            'OPTIONS': {'uri': True},
+            'PRAGMAS': {**reader_pragmas, 'query_only': 'ON'},
+        }
+        return alias, f'{alias}-reader'
+
+    def remove_databases(self, aliases):
+        for alias in set(aliases):
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+
+    def run(self, name, alias, reader_alias, writers, readers, duration,
+            posts, page_size):
+        author = self.create_tables(alias, posts)
+
+        def write():
+            with transaction.atomic(using=alias):
+                Post.objects.using(alias).bulk_create(
+                    [Post(author=author, text='Новый пост')])
+
+        def read():
+            list(Post.objects.using(reader_alias).select_related('author')
+                 .order_by('-pub_date', '-id')[:page_size])
+
+        timings, errors = self.measure(
+            [(alias, write)] * writers + [(reader_alias, read)] * readers,
+            duration)
+        self.stdout.write(
+            f'{name}: записей {self.describe(timings[write], duration)}, '
+            f'чтений {self.describe(timings[read], duration)}, ошибок '
+            f'блокировки: {errors}.')
+
+    def create_tables(self, alias, posts):
+        """
+        Создаёт таблицы пользователей, сообществ и постов и `posts`
+        постов одного автора. Возвращает автора.
+        """
+        with connections[alias].schema_editor() as editor:
+            for model in (User, Group, Post):
+                editor.create_model(model)
+        # Пакетная вставка не рассылает сигналы моделей: их обработчики
+        # пишут в основную БД.
+        User.objects.using(alias).bulk_create([User(username='benchmark')])
+        author = User.objects.using(alias).get()
+        Post.objects.using(alias).bulk_create(
+            (Post(author=author, text=f'Пост {number}')
+             for number in range(posts)),
+            batch_size=1000,
+        )
+        return author
+
+    def measure(self, workers, duration):
+        """
+        Вызывает в отдельном потоке на каждую пару `(псевдоним БД,
+        функция)` функцию в цикле в течение `duration` секунд. Возвращает
+        время успешных вызовов каждой функции и число ошибок блокировки.
+        """
+        timings = defaultdict(list)
+        errors = []
+        start = threading.Barrier(len(workers) + 1)
+        lock = threading.Lock()
+
+        def worker(using, function):
+            results = []
+            start.wait()
+            deadline = time.perf_counter() + duration
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        function()
+                    except OperationalError:
+                        errors.append(using)
+                    else:
+                        results.append(time.perf_counter() - started)
+            finally:
+                connections[using].close()
+                with lock:
+                    timings[function] += results
+
+        threads = [threading.Thread(target=worker, args=args)
+                   for args in workers]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        for thread in threads:
+            thread.join()
+        return timings, len(errors)
+
+    def describe(self, timings, duration):
+        if not timings:
+            return '0/с'
+        timings.sort()
+        return (f'{len(timings) / duration:.0f}/с (медиана '
+                f'{statistics.median(timings) * 1000:.1f} мс, p95 '
+                f'{timings[int(len(timings) * 0.95)] * 1000:.1f} мс)')
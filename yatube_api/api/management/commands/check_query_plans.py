@@ -0,0 +1,133 @@
+"""
+Команда проверки планов запросов всех ViewSet API.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import Http404
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.urls import router_v1
+from posts.models import User
+
+# Полный просмотр таблицы или всего индекса: `SCAN posts_post`,
+# `SCAN U0 USING INDEX ...` для таблицы подзапроса или, в старых версиях
+# SQLite, `SCAN TABLE posts_post`.
+FULL_SCAN_RE = re.compile(
+    r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS \w+)?'
+    r'(?: USING (?:COVERING )?INDEX \w+)?$')
+# Псевдонимы таблиц в подзапросах Django: `FROM "posts_follow" U0`.
+ALIAS_RE = re.compile(r'"(?P<table>\w+)" (?P<alias>U\d+)\b')
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN QUERY PLAN для QuerySet каждого ViewSet API '
+            'и завершается с ошибкой, если запрос полностью просматривает '
+            'таблицу больше `--max-rows` строк.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-rows', type=int, default=1000,
+            help='Полный просмотр таблиц не больше этого размера допустим.',
+        )
+        parser.add_argument(
+            '--url-kwarg', action='append', default=[], metavar='NAME=VALUE',
+            help='Значение параметра URL, например `post_id=1`. '
+                 'По умолчанию используется 1.',
+        )
+
+    def handle(self, *args, max_rows, url_kwarg, verbosity, **options):
+        self.verbosity = verbosity
+        url_kwargs = dict(item.split('=', 1) for item in url_kwarg)
+        failures = []
+        for prefix, viewset, basename in router_v1.registry:
+            queryset = self.get_queryset(viewset, prefix, url_kwargs)
+            if queryset is None:
+                self.stdout.write(f'{basename}: пропущен (объект из URL '
+                                  'не найден)')
+                continue
+            if not isinstance(queryset, QuerySet):
+                self.stdout.write(f'{basename}: пропущен (данные из кэша '
+                                  'процесса)')
+                continue
+            scans = list(self.explain(queryset))
+            if not scans:
+                self.stdout.write(f'{basename}: OK')
+            for table, detail in scans:
+                rows = self.count_rows(queryset.db, table)
+                status = 'OK'
+                if rows > max_rows:
+                    status = 'FAIL'
+                    failures.append(f'{basename}: {detail} ({rows} строк)')
+                self.stdout.write(f'{basename}: {detail} ({rows} строк) '
+                                  f'{status}')
+        if failures:
+            raise CommandError(
+                'Полный просмотр больших таблиц:\n' + '\n'.join(failures))
+        self.stdout.write('Полных просмотров больших таблиц нет.')
+
+    def get_queryset(self, viewset, prefix, url_kwargs):
+        """
+        Возвращает QuerySet, который ViewSet использует для списка, а без
+        списка — для поиска объекта по `lookup_field`.
+        """
+        kwargs = {
+            name: url_kwargs.get(name, '1')
+            for name in re.compile(prefix).groupindex
+        }
+        action = 'list' if hasattr(viewset, 'list') else 'retrieve'
+        request = Request(APIRequestFactory().get('/'))
+        request.user = User.objects.order_by('pk').first() or User(pk=0)
+        view = viewset(action=action, args=(), kwargs=kwargs,
+                       request=request, format_kwarg=None)
+        try:
+            queryset = view.filter_queryset(view.get_queryset())
+        except Http404:
+            return None
+        if not isinstance(queryset, QuerySet):
+            return queryset
+        if action == 'retrieve':
+            return queryset.filter(**{view.lookup_field: '0'})
+        return queryset[:100]
+
+    def explain(self, queryset):
+        """
+        Возвращает таблицы, которые запрос просматривает полностью.
+
+        Список всей таблицы без условий читается постранично, поэтому
+        просмотр основной таблицы такого QuerySet допустим.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        allowed = set()
+        if not queryset.query.where:
+            allowed.add(queryset.model._meta.db_table)
+        sql, params = queryset.query.sql_with_params()
+        aliases = {
+            match['alias']: match['table'] for match in ALIAS_RE.finditer(sql)
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = cursor.fetchall()
+        for row in plan:
+            if self.verbosity > 1:
+                self.stdout.write(f'  {row[-1]}')
+            match = FULL_SCAN_RE.match(row[-1])
+            if match is None:
+                continue
+            table = aliases.get(match['table'], match['table'])
+            if table not in allowed:
+                yield table, row[-1]
+
+    def count_rows(self, using, table):
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
@@ -0,0 +1,16 @@
+"""
+Команда перестроения поискового индекса постов.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает поисковый индекс постов, например после '
+            'изменения текста постов в обход сигналов.')
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write('Поисковый индекс перестроен.')
@@ -0,0 +1,36 @@
+"""
+Команда копирования основной БД SQLite в файлы реплик.
+"""
+
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную БД SQLite в файлы реплик '
+            '`DATABASE_REPLICA_FILES`, чтобы проверить чтение из реплик '
+            'локально.')
+
+    def handle(self, *args, **options):
+        primary = connections['default'].settings_dict
+        if primary['ENGINE'] not in ('django.db.backends.sqlite3',
+                                     'api.backends.sqlite3'):
+            raise CommandError('Команда поддерживает только SQLite.')
+        source_path = Path(primary['NAME']).resolve()
+        source = sqlite3.connect(source_path)
+        try:
+            for path in settings.DATABASE_REPLICA_FILES:
+                if Path(path).resolve() == source_path:
+                    continue
+                target = sqlite3.connect(path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'Реплика {path} обновлена.')
+        finally:
+            source.close()
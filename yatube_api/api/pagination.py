@@ -0,0 +1,138 @@
+"""
+Данный модуль содержит пользовательские классы пагинации
+для Django REST Framework.
+"""
+
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по составному ключу `(pub_date, id)`.
+
+    Страница выбирается условием
+    `pub_date < p OR (pub_date = p AND id < i)` по составному индексу,
+    поэтому стоимость запроса зависит только от размера страницы,
+    а не от глубины прокрутки. `COUNT(*)` не выполняется.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 100
+    max_limit = 1000
+    position_field = 'pub_date'
+    tiebreak_field = 'id'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+
+        queryset = queryset.order_by(
+            f'-{self.position_field}', f'-{self.tiebreak_field}')
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, tiebreak = position
+            queryset = queryset.filter(
+                Q(**{f'{self.position_field}__lt': value})
+                | Q(**{self.position_field: value,
+                       f'{self.tiebreak_field}__lt': tiebreak})
+            )
+
+        # Запрашиваем на одну запись больше, чтобы узнать, есть ли
+        # следующая страница, не выполняя COUNT(*).
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[:self.limit]
+        return self.page
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def decode_cursor(self, request):
+        """
+        Возвращает позицию `(pub_date, id)` из параметра запроса
+        или `None` для первой страницы.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            decoded = b64decode(encoded.encode('ascii')).decode('ascii')
+            raw_value, raw_tiebreak = decoded.rsplit('|', 1)
+            value = parse_datetime(raw_value)
+            tiebreak = int(raw_tiebreak)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, tiebreak
+
+    def encode_cursor(self, instance):
+        value = getattr(instance, self.position_field)
+        tiebreak = getattr(instance, self.tiebreak_field)
+        raw = f'{value.isoformat()}|{tiebreak}'
+        return b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param,
+            self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class PostPagination(LimitOffsetPagination):
+    """
+    Пагинация постов.
+
+    По умолчанию работает как `LimitOffsetPagination`. Если в запросе
+    передан параметр `cursor` (в том числе пустой — для первой страницы),
+    включается курсорная пагинация `KeysetPagination`.
+
+    Курсор задаёт порядок по дате и сбросил бы порядок по релевантности,
+    поэтому вместе с параметром поиска представления (`search_param`)
+    он отклоняется.
+    """
+    keyset_class = KeysetPagination
+    cursor_with_search_message = (
+        'Курсорная пагинация недоступна для результатов поиска: '
+        'используйте параметры limit и offset.')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        cursor_param = self.keyset_class.cursor_query_param
+        if cursor_param in request.query_params:
+            search_param = getattr(view, 'search_param', None)
+            if search_param in request.query_params:
+                raise ValidationError(
+                    {cursor_param: [self.cursor_with_search_message]})
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,43 @@
+"""
+Данный модуль содержит быстрый JSON-парсер API.
+
+Тело запроса в UTF-8 разбирается необязательным пакетом `orjson`, если
+он установлен. Без него, для других кодировок и при ошибке разбора
+используется стандартный `JSONParser`: он же формирует сообщение об
+ошибке. `orjson` превращает целые больше 64 бит в float, поэтому тела
+с такими длинными числами тоже разбираются стандартным парсером.
+"""
+
+import codecs
+import re
+from io import BytesIO
+
+from django.conf import settings
+
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+# 19 цифр подряд: возможно, целое вне диапазона 64 бит.
+LONG_NUMBER_RE = re.compile(rb'\d{19}')
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON-парсер на `orjson` с запасным стандартным `json`.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER_RE.search(body):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
@@ -23,7 +23,17 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         """
         Разрешает запрос если метод является безопасным или если пользователь
-        является автором объекта.
+        является автором объекта. Сравниваются идентификаторы, поэтому
+        автор объекта из БД не загружается.
         """
         return request.method in permissions.SAFE_METHODS or (
-            obj.author == request.user)
+            obj.author_id == request.user.pk)
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Ограничивает QuerySet объектами, которые пользователь может
+        изменять, условием в SQL без загрузки объектов.
+        """
+        if request.method in permissions.SAFE_METHODS:
+            return queryset
+        return queryset.filter(author_id=request.user.pk)
@@ -0,0 +1,54 @@
+"""
+Данный модуль содержит быстрый JSON-рендерер API.
+
+Если установлен необязательный пакет `orjson`, ответ сериализуется им:
+строки, числа, словари, списки, а также даты и время (в том же формате
+ISO 8601 с `Z` для UTC, что и у `rest_framework.utils.encoders`)
+обрабатываются в C без вызова Python-кода на каждый объект. Остальные
+типы (ленивые строки, Decimal, QuerySet и т. д.) передаются кодировщику
+DRF. Без `orjson`, а также для форматированного вывода (`indent`)
+и нестандартных `COMPACT_JSON`/`UNICODE_JSON` используется стандартный
+`JSONRenderer`; он же отрисовывает данные, которые `orjson` не
+сериализует (например, целые числа больше 64 бит).
+
+Ответ совпадает с ответом `JSONRenderer` побайтно, если в данных нет
+чисел с плавающей точкой (в моделях API их нет). Для них `orjson`
+записывает то же значение короче (`1e-7` вместо `1e-07`), а `NaN` и
+бесконечности — как `null`, тогда как `JSONRenderer` отказывается их
+сериализовать.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+                  if orjson is not None else 0)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на `orjson` с запасным стандартным `json`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None
+                or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        # Как и `JSONRenderer`, экранируем U+2028 и U+2029, чтобы ответ
+        # оставался корректным JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,148 @@
+"""
+Данный модуль содержит маршрутизацию запросов к БД между основной БД
+и репликами для чтения.
+
+`safe_method_read_middleware` отмечает запросы с безопасными HTTP-методами,
+и на время такого запроса `ReadWriteRouter` отправляет чтение в одну из
+реплик `DATABASE_REPLICAS`. Запись и чтение остальных запросов идут
+в `default`, поэтому запрос видит собственные изменения.
+
+Реплика может отставать от основной БД, поэтому после записи чтение
+пользователя ещё `DATABASE_STICKY_SECONDS` секунд идёт в `default`.
+Пользователь определяется по JWT-токену, а отметка о записи хранится
+в общем для процессов кэше `DATABASE_STICKY_CACHE_ALIAS`: следующий
+запрос может попасть в другой процесс.
+"""
+
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.decorators import sync_and_async_middleware
+
+from .authentication import get_token_user_id
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """
+    Состояние маршрутизации одного запроса.
+    """
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+def sticky_key(user_id):
+    return f'db-sticky:{user_id}'
+
+
+def get_sticky_cache():
+    return caches[settings.DATABASE_STICKY_CACHE_ALIAS]
+
+
+def check_sticky_cache(app_configs, **kwargs):
+    """
+    Предупреждает, если при чтении из реплик отметки записи хранятся
+    в памяти процесса.
+    """
+    if settings.DATABASE_REPLICAS and isinstance(get_sticky_cache(),
+                                                 LocMemCache):
+        return [checks.Warning(
+            'Отметки записи для чтения из реплик хранятся в памяти '
+            'процесса: запрос после записи, попавший в другой процесс, '
+            'прочитает отстающую реплику.',
+            hint='Укажите в DATABASE_STICKY_CACHE_ALIAS общий кэш.',
+            id='api.W002',
+        )]
+    return []
+
+
+def start_request(request):
+    """
+    Возвращает состояние маршрутизации запроса.
+    """
+    use_replica = request.method in SAFE_METHODS
+    if use_replica and 'HTTP_AUTHORIZATION' in request.META:
+        user_id = get_token_user_id(request.META['HTTP_AUTHORIZATION'])
+        use_replica = (user_id is None
+                       or get_sticky_cache().get(sticky_key(user_id)) is None)
+    return RoutingState(use_replica)
+
+
+def finish_request(request, state):
+    """
+    Направляет чтение пользователя в `default` на
+    `DATABASE_STICKY_SECONDS` секунд, если запрос что-то записал.
+    """
+    if not state.wrote or settings.DATABASE_STICKY_SECONDS <= 0:
+        return
+    user_id = get_token_user_id(request.META.get('HTTP_AUTHORIZATION'))
+    if user_id is not None:
+        get_sticky_cache().set(sticky_key(user_id), True,
+                               settings.DATABASE_STICKY_SECONDS)
+
+
+@sync_and_async_middleware
+def safe_method_read_middleware(get_response):
+    """
+    Отмечает обработку запроса с безопасным HTTP-методом. Поддерживает
+    асинхронный режим, чтобы не лишать ASGI асинхронных представлений.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            state = start_request(request)
+            token = routing_state.set(state)
+            try:
+                return await get_response(request)
+            finally:
+                routing_state.reset(token)
+                finish_request(request, state)
+    else:
+        def middleware(request):
+            state = start_request(request)
+            token = routing_state.set(state)
+            try:
+                return get_response(request)
+            finally:
+                routing_state.reset(token)
+                finish_request(request, state)
+    return middleware
+
+
+class ReadWriteRouter:
+    """
+    Направляет чтение безопасных запросов в случайную реплику из
+    `DATABASE_REPLICAS`, а всё остальное — в `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is not None and state.use_replica:
+            replicas = settings.DATABASE_REPLICAS
+            if replicas:
+                return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            # Дальнейшее чтение запроса должно видеть эту запись.
+            state.use_replica = False
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
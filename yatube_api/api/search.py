@@ -0,0 +1,110 @@
+"""
+Данный модуль содержит полнотекстовый поиск по тексту постов.
+
+Движок выбирается настройкой `POST_SEARCH_BACKEND`:
+
+* `SQLiteFTS5Backend` — индекс FTS5 в SQLite (таблица
+  `posts_post_fts`), результаты ранжируются по BM25;
+* `SimpleSearchBackend` — поиск `icontains` без индекса для любой БД.
+
+Другой движок подключается классом с методами `index`, `remove`,
+`rebuild` и `search`. Индекс обновляется сигналами сохранения и удаления
+`Post` (см. `api.signals`).
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils.module_loading import import_string
+
+from posts.models import Post
+
+TERM_RE = re.compile(r'\w+')
+
+
+def get_terms(query):
+    """
+    Разбивает поисковый запрос на слова.
+    """
+    return TERM_RE.findall(query)
+
+
+class SimpleSearchBackend:
+    """
+    Поиск постов, содержащих все слова запроса, без индекса.
+    """
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(text__icontains=term)
+        return queryset.order_by('-pub_date', '-id')
+
+
+class SQLiteFTS5Backend:
+    """
+    Поиск по индексу FTS5, хранящему текст постов по `rowid = Post.id`.
+    """
+    table = 'posts_post_fts'
+
+    def get_connection(self):
+        return connections[router.db_for_write(Post)]
+
+    def index(self, post):
+        with self.get_connection().cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {self.table} (rowid, text) '
+                'VALUES (%s, %s)',
+                [post.pk, post.text],
+            )
+
+    def remove(self, post_id):
+        with self.get_connection().cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id])
+
+    def rebuild(self):
+        with self.get_connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}')
+
+    def build_match(self, terms):
+        # Каждое слово берётся в кавычки, чтобы пользовательский ввод
+        # не разбирался как синтаксис запросов FTS5.
+        return ' '.join('"{}"'.format(term) for term in terms)
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        return queryset.extra(
+            select={'search_rank': f'{self.table}.rank'},
+            tables=[self.table],
+            where=[
+                f'{self.table}.rowid = {Post._meta.db_table}.id',
+                f'{self.table} MATCH %s',
+            ],
+            params=[self.build_match(terms)],
+        ).order_by('search_rank', '-pub_date', '-id')
+
+
+def get_search_backend():
+    """
+    Возвращает экземпляр движка поиска из настройки
+    `POST_SEARCH_BACKEND`.
+    """
+    return import_string(settings.POST_SEARCH_BACKEND)()
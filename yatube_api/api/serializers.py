@@ -3,34 +3,233 @@
 моделей Django в JSON и обратно.
 """
 
-import base64
+import binascii
+import re
+from io import BytesIO
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            TemporaryUploadedFile)
+from django.db import connections, router
+from django.db.models.signals import post_save
 
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer)
+from PIL import Image
 from rest_framework.relations import SlugRelatedField
 
 from posts.models import Comment, Follow, Group, Post, User
 
+# Символы вне алфавита base64 (например, переносы строк), которые
+# `base64.b64decode` пропускает.
+NON_BASE64_RE = re.compile(r'[^A-Za-z0-9+/=]')
+WHITESPACE = (' ', '\t', '\r', '\n')
+
 
 class Base64ImageField(serializers.ImageField):
     """
     Пользовательское поле сериализатора для обработки изображений
     в формате base64.
+
+    Строка декодируется частями прямо во временный файл: небольшие
+    изображения остаются в памяти, крупнее `FILE_UPLOAD_MAX_MEMORY_SIZE`
+    пишутся на диск. Размер в байтах и пикселях проверяется до полного
+    декодирования.
     """
+    default_error_messages = {
+        'max_bytes': 'Размер изображения превышает {max_bytes} байт.',
+        'max_pixels': 'Изображение содержит больше {max_pixels} пикселей.',
+    }
+    # Размер части в символах base64, кратен 4.
+    chunk_size = 64 * 1024
 
     def to_internal_value(self, data):
         """
         Преобразует значение изображения из формата base64 в объект файла.
         """
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext, )
+            data = self.decode(data)
 
         return super().to_internal_value(data)
 
+    def decode(self, data):
+        separator = data.find(';base64,')
+        if separator == -1:
+            self.fail('invalid_image')
+        ext = data[:separator].split('/')[-1]
+        start = separator + len(';base64,')
+
+        max_bytes = settings.IMAGE_UPLOAD_MAX_BYTES
+        whitespace = sum(data.count(char, start) for char in WHITESPACE)
+        estimated_size = (len(data) - start - whitespace) // 4 * 3
+        if estimated_size > max_bytes:
+            self.fail('max_bytes', max_bytes=max_bytes)
+
+        name = 'temp.' + ext
+        content_type = 'image/' + ext
+        if estimated_size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            file = TemporaryUploadedFile(name, content_type, 0, None)
+        else:
+            file = InMemoryUploadedFile(
+                BytesIO(), None, name, content_type, 0, None)
+
+        size = 0
+        pixels_checked = False
+        try:
+            for chunk in self.decode_chunks(data, start):
+                if not size:
+                    pixels_checked = self.check_pixels(BytesIO(chunk))
+                size += len(chunk)
+                file.write(chunk)
+            file.seek(0)
+            if not pixels_checked:
+                self.check_pixels(file)
+                file.seek(0)
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_image')
+        except serializers.ValidationError:
+            file.close()
+            raise
+
+        file.size = size
+        return file
+
+    def decode_chunks(self, data, start):
+        """
+        Декодирует `data[start:]` частями по `chunk_size` символов.
+        Символы вне алфавита base64 пропускаются, а символы после
+        последней полной четвёрки переносятся в следующую часть.
+        """
+        leftover = ''
+        for position in range(start, len(data), self.chunk_size):
+            text = leftover + NON_BASE64_RE.sub(
+                '', data[position:position + self.chunk_size])
+            end = len(text) // 4 * 4
+            leftover = text[end:]
+            yield binascii.a2b_base64(text[:end])
+        if leftover:
+            yield binascii.a2b_base64(leftover)
+
+    def check_pixels(self, file):
+        """
+        Отклоняет изображение по размерам из заголовка. Возвращает `False`,
+        если заголовок прочитать не удалось.
+        """
+        max_pixels = settings.IMAGE_UPLOAD_MAX_PIXELS
+        try:
+            width, height = Image.open(file).size
+        except Image.DecompressionBombError:
+            self.fail('max_pixels', max_pixels=max_pixels)
+        except Exception:
+            return False
+        if width * height > max_pixels:
+            self.fail('max_pixels', max_pixels=max_pixels)
+        return True
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка объектов для пакетного создания.
+
+    Если в контексте не передан `atomic=True`, невалидные элементы не
+    прерывают обработку: их ошибки сохраняются в `item_errors`, а
+    валидные элементы создаются.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        max_items = settings.BULK_CREATE_MAX_ITEMS
+        if len(data) > max_items:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Нельзя создать больше {max_items} объектов за запрос.'
+                ]
+            })
+
+        validated_items = []
+        self.item_errors = []
+        for item in data:
+            try:
+                validated_items.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                validated_items.append(None)
+                self.item_errors.append(exc.detail)
+            else:
+                self.item_errors.append({})
+
+        if self.context.get('atomic') and any(self.item_errors):
+            raise serializers.ValidationError(self.item_errors)
+        return validated_items
+
+    def bulk_create(self, **kwargs):
+        """
+        Создаёт валидные объекты пакетной вставкой и рассылает для них
+        сигнал `post_save`.
+
+        Если база данных не возвращает первичные ключи из пакетной
+        вставки, объекты сохраняются по одному: ключи нужны для ответа
+        и обработчиков сигналов. Транзакцией управляет вызывающий код.
+        """
+        model = self.child.Meta.model
+        objs = [
+            model(**attrs, **kwargs)
+            for attrs in self.validated_data if attrs is not None
+        ]
+        using = router.db_for_write(model)
+        if not connections[using].features.can_return_rows_from_bulk_insert:
+            for obj in objs:
+                obj.save(using=using)
+            return objs
+
+        model.objects.using(using).bulk_create(
+            objs, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+        for obj in objs:
+            post_save.send(sender=model, instance=obj, created=True,
+                           update_fields=None, raw=False, using=using)
+        return objs
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    """
+    Список идентификаторов для пакетного удаления.
+
+    Идентификаторы ограничены диапазоном `BigAutoField`, логические
+    значения не принимаются.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=2 ** 63 - 1))
+
+
+def build_image_srcset(storage, name, image_variants, request=None):
+    """
+    Возвращает URL копий изображения по форматам и ширине. Пока копии
+    не созданы, вместо них отдаётся URL оригинала.
+    """
+    def build_url(name):
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    original = build_url(name)
+    variants = {}
+    if image_variants.get('source') == name:
+        variants = image_variants['variants']
+    return {
+        image_format: {
+            str(width): (
+                build_url(variants[image_format][str(width)])
+                if str(width) in variants.get(image_format, {})
+                else original
+            )
+            for width in settings.IMAGE_DERIVATIVE_WIDTHS
+        }
+        for image_format in settings.IMAGE_DERIVATIVE_FORMATS
+    }
+
 
 class PostSerializer(serializers.ModelSerializer):
     """
@@ -40,10 +239,20 @@ class PostSerializer(serializers.ModelSerializer):
     image = Base64ImageField(required=False, allow_null=True)
     pub_date = serializers.DateTimeField(format="%Y-%m-%d %H:%M",
                                          read_only=True, )
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ('id', 'text', 'pub_date', 'author', 'image', 'group',)
+        fields = ('id', 'text', 'pub_date', 'author', 'image', 'image_srcset',
+                  'group', 'comments_count',)
+        list_serializer_class = BulkCreateListSerializer
+
+    def get_image_srcset(self, post):
+        if not post.image:
+            return None
+        return build_image_srcset(
+            post.image.storage, post.image.name, post.image_variants,
+            self.context.get('request'))
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -67,6 +276,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'author', 'post', 'text', 'created',)
         read_only_fields = ('post', 'created',)
+        list_serializer_class = BulkCreateListSerializer
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -95,3 +305,33 @@ class FollowSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Вы уже подписаны на этого автора')
         return data
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор пользователя со счётчиками из `Profile`.
+    """
+    posts_count = serializers.IntegerField(
+        source='profile.posts_count', read_only=True, default=0)
+    followers_count = serializers.IntegerField(
+        source='profile.followers_count', read_only=True, default=0)
+    following_count = serializers.IntegerField(
+        source='profile.following_count', read_only=True, default=0)
+
+    class Meta:
+        model = User
+        fields = ('username', 'posts_count', 'followers_count',
+                  'following_count',)
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """
+    Сериализатор получения JWT-токенов, добавляющий в токен имя
+    пользователя для `StatelessJWTAuthentication`.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        return token
@@ -0,0 +1,267 @@
+"""
+Данный модуль содержит обработчики сигналов моделей.
+"""
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from posts.counters import adjust_counter
+from posts.models import Comment, Follow, Group, Post, Profile, User
+
+from .authentication import token_user_cache
+from .cache import invalidate
+from .events import broker
+from .feed import get_feed_strategy
+from .filters import group_slug_cache, username_cache
+from .groups import group_cache
+from .images import release_image, schedule_derivatives
+from .search import get_search_backend
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Применяет к новому подключению SQLite настройки из ключа `PRAGMAS`
+    описания БД в `DATABASES`. Подключение, повторно выданное пулом,
+    уже настроено.
+    """
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if (connection.vendor != 'sqlite' or not pragmas
+            or getattr(connection, 'connection_reused', False)):
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def discard_on_commit(discard, pk):
+    """
+    Удаляет запись кэша процесса сразу и ещё раз после фиксации
+    транзакции: до фиксации конкурентный запрос может загрузить старый
+    объект и снова положить его в кэш.
+    """
+    discard(pk)
+    transaction.on_commit(lambda: discard(pk))
+
+
+@receiver(post_delete, sender=Follow)
+def remove_unfollowed_posts_from_feed(sender, instance, **kwargs):
+    """
+    Убирает из ленты подписчика посты автора, от которого он отписался.
+    """
+    get_feed_strategy().unfollow(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш списка постов, самого поста и его комментариев.
+    """
+    invalidate('posts', f'posts:{instance.pk}', f'comments:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+def publish_post_event(sender, instance, created, raw=False, **kwargs):
+    """
+    Отправляет подписчикам потока событие о новом посте.
+    """
+    if created and not raw:
+        transaction.on_commit(lambda: broker.publish(
+            'post', post_id=instance.pk, author_id=instance.author_id,
+            group_id=instance.group_id))
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_event(sender, instance, created, raw=False, **kwargs):
+    """
+    Отправляет подписчикам потока событие о новом комментарии. Фильтры
+    по сообществу и автору применяются к посту комментария.
+    """
+    if created and not raw and len(broker):
+        post = instance.post
+        transaction.on_commit(lambda: broker.publish(
+            'comment', comment_id=instance.pk, post_id=post.pk,
+            author_id=post.author_id, group_id=post.group_id))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """
+    Добавляет текст поста в поисковый индекс.
+    """
+    if update_fields is None or 'text' in update_fields:
+        get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    """
+    Удаляет удалённый пост из поискового индекса.
+    """
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш комментариев поста.
+    """
+    invalidate(f'comments:{instance.post_id}')
+
+
+def _counter_delta(signal, created, raw):
+    """
+    Возвращает изменение счётчика: +1 при создании объекта, -1 при
+    удалении и 0 при изменении или загрузке фикстур.
+    """
+    if signal is post_delete:
+        return -1
+    if created and not raw:
+        return 1
+    return 0
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comments_count(sender, instance, signal, created=False,
+                          raw=False, **kwargs):
+    """
+    Изменяет счётчик комментариев поста.
+    """
+    delta = _counter_delta(signal, created, raw)
+    if delta:
+        adjust_counter(Post.objects.filter(pk=instance.post_id),
+                       'comments_count', delta)
+        invalidate('posts', f'posts:{instance.post_id}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_posts_count(sender, instance, signal, created=False, raw=False,
+                       **kwargs):
+    """
+    Изменяет счётчик постов автора.
+    """
+    delta = _counter_delta(signal, created, raw)
+    if delta:
+        adjust_counter(Profile.objects.filter(user_id=instance.author_id),
+                       'posts_count', delta)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def update_follow_counts(sender, instance, signal, created=False, raw=False,
+                         **kwargs):
+    """
+    Изменяет счётчики подписок подписчика и подписчиков автора.
+    """
+    delta = _counter_delta(signal, created, raw)
+    if delta:
+        adjust_counter(Profile.objects.filter(user_id=instance.user_id),
+                       'following_count', delta)
+        adjust_counter(Profile.objects.filter(user_id=instance.following_id),
+                       'followers_count', delta)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш групп и слагов групп.
+    """
+    invalidate('groups')
+    discard_on_commit(group_slug_cache.discard, instance.pk)
+    transaction.on_commit(group_cache.clear)
+
+
+@receiver(post_save, sender=Post)
+def generate_image_derivatives(sender, instance, raw=False, **kwargs):
+    """
+    Запускает генерацию копий нового изображения поста.
+    """
+    if raw or not instance.image:
+        return
+    if instance.image_variants.get('source') != instance.image.name:
+        schedule_derivatives(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, created, raw=False, **kwargs):
+    """
+    Освобождает прежнее изображение поста после его замены.
+    """
+    loaded_image = getattr(instance, '_loaded_image', None)
+    if raw or created or not loaded_image:
+        return
+    if loaded_image != instance.image.name:
+        release_image(loaded_image, instance._loaded_image_variants)
+    instance._loaded_image = instance.image.name
+    instance._loaded_image_variants = instance.image_variants
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    """
+    Освобождает изображение удалённого поста.
+    """
+    if instance.image:
+        release_image(instance.image.name, instance.image_variants)
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    """
+    Создаёт профиль со счётчиками для нового пользователя.
+    """
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, raw=False,
+                      **kwargs):
+    """
+    Запоминает имя пользователя из БД, чтобы после сохранения узнать,
+    изменилось ли оно.
+    """
+    instance._saved_username = None
+    if raw or instance.pk is None or (
+            update_fields is not None and 'username' not in update_fields):
+        return
+    instance._saved_username = User.objects.filter(
+        pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cache(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш постов и комментариев пользователя после смены
+    имени: ответы содержат имя автора.
+    """
+    saved_username = getattr(instance, '_saved_username', None)
+    if created or saved_username in (None, instance.username):
+        return
+    post_ids = Post.objects.filter(author=instance).values_list(
+        'id', flat=True)
+    commented_post_ids = Comment.objects.filter(
+        author=instance).values_list('post_id', flat=True).distinct()
+    invalidate(
+        'posts',
+        *(f'posts:{post_id}' for post_id in post_ids),
+        *(f'comments:{post_id}' for post_id in commented_post_ids),
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def discard_cached_tokens(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированные токены и имя изменённого или удалённого
+    пользователя.
+    """
+    discard_on_commit(token_user_cache.discard_user, instance.pk)
+    discard_on_commit(username_cache.discard, instance.pk)
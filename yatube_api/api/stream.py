@@ -0,0 +1,165 @@
+"""
+Данный модуль содержит ASGI-приложение потока событий (Server-Sent
+Events) о новых постах и комментариях.
+
+Django 3.2 отдаёт `StreamingHttpResponse` синхронным итератором прямо
+в цикле событий, поэтому поток обслуживается отдельным ASGI-приложением,
+которое `yatube_api.asgi` ставит перед Django по пути
+`EVENT_STREAM_PATH`. Параметры запроса:
+
+* `group` — только события постов сообщества;
+* `following=1` — только события авторов, на которых подписан
+  пользователь из JWT-токена.
+
+Пропущенные из-за переполнения очереди события обозначаются событием
+`dropped` с их числом: клиенту стоит перечитать ленту обычным запросом.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from posts.models import Follow
+
+from .authentication import get_token_user_id
+from .events import SubscriptionClosed, broker
+
+
+def format_event(event_type, data, event_id=None):
+    lines = [f'event: {event_type}']
+    if event_id is not None:
+        lines.insert(0, f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data)}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+async def send_error(send, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps({'detail': message}).encode(),
+    })
+
+
+def get_user_id(scope):
+    """
+    Возвращает идентификатор пользователя из заголовка `Authorization`
+    или None.
+    """
+    headers = dict(scope['headers'])
+    return get_token_user_id(
+        headers.get(b'authorization', b'').decode('latin1'))
+
+
+async def build_predicate(scope, send):
+    """
+    Строит фильтр событий по параметрам запроса. Если параметры
+    некорректны, отправляет ответ с ошибкой и возвращает None.
+    """
+    params = parse_qs(scope['query_string'].decode('latin1'))
+    checks = []
+
+    group = params.get('group', [None])[-1]
+    if group is not None:
+        if not group.isdecimal():
+            await send_error(send, 400, 'Укажите идентификатор сообщества.')
+            return None
+        group_id = int(group)
+        checks.append(lambda event: event['group_id'] == group_id)
+
+    if params.get('following', [None])[-1] in ('1', 'true'):
+        user_id = get_user_id(scope)
+        if user_id is None:
+            await send_error(send, 401, 'Учетные данные не были '
+                                        'предоставлены.')
+            return None
+        # Подписки читаются один раз при подключении.
+        authors = await sync_to_async(set)(
+            Follow.objects.filter(user_id=user_id).values_list(
+                'following_id', flat=True))
+        checks.append(lambda event: event['author_id'] in authors)
+
+    return lambda event: all(check(event) for check in checks)
+
+
+async def send_events(subscription, send, disconnect):
+    """
+    Отправляет события подписки, пока клиент не отключится или подписка
+    не будет закрыта.
+    """
+    while not disconnect.done():
+        try:
+            event, dropped = await asyncio.wait_for(
+                subscription.get(), settings.EVENT_STREAM_KEEPALIVE)
+        except asyncio.TimeoutError:
+            await send({'type': 'http.response.body',
+                        'body': b': keepalive\n\n', 'more_body': True})
+            continue
+        except SubscriptionClosed:
+            break
+        body = format_event(event['type'], event, event['id'])
+        if dropped:
+            body = format_event('dropped', {'count': dropped}) + body
+        await send({'type': 'http.response.body', 'body': body,
+                    'more_body': True})
+    if not disconnect.done():
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def stream_events(scope, receive, send):
+    """
+    Отдаёт события брокера, пока клиент не отключится.
+    """
+    if scope['method'] != 'GET':
+        await send_error(send, 405, 'Метод не разрешён.')
+        return
+    predicate = await build_predicate(scope, send)
+    if predicate is None:
+        return
+    subscription = broker.subscribe(predicate)
+    if subscription is None:
+        await send_error(send, 503, 'Слишком много подключений.')
+        return
+
+    async def wait_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        subscription.close()
+
+    disconnect = asyncio.ensure_future(wait_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send_events(subscription, send, disconnect)
+    finally:
+        broker.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+def get_stream_application(application):
+    """
+    Возвращает ASGI-приложение, которое отдаёт поток событий по пути
+    `EVENT_STREAM_PATH`, а остальные запросы передаёт `application`.
+    """
+    async def router(scope, receive, send):
+        if (scope['type'] == 'http'
+                and scope['path'] == settings.EVENT_STREAM_PATH):
+            await stream_events(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+
+    return router
@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework import routers
 
-from api.views import CommentViewSet, FollowViewSet, GroupViewSet, PostViewSet
+from api.async_views import async_read_urls
+from api.views import (CommentViewSet, FeedViewSet, FollowViewSet,
+                       GroupViewSet, PostViewSet, UserViewSet)
 
 app_name = 'api'
 
@@ -15,10 +18,16 @@ router_v1.register(r'posts/(?P<post_id>\d+)/comments', CommentViewSet,
                    basename='comments', )
 router_v1.register(r'groups', GroupViewSet, basename='groups', )
 router_v1.register(r'follow', FollowViewSet, basename='follow', )
+router_v1.register(r'feed', FeedViewSet, basename='feed', )
+router_v1.register(r'users', UserViewSet, basename='users', )
+
+router_urls = router_v1.urls
+if settings.API_ASYNC_READS:
+    router_urls = async_read_urls(router_urls)
 
 urlpatterns = [
     # Подключение маршрутов роутера.
-    path('', include(router_v1.urls), ),
+    path('', include(router_urls), ),
 
     # Подключение URL-маршрутов для работы с токенами (djoser).
     path('', include('djoser.urls.jwt'), ),
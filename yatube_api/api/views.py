@@ -1,39 +1,190 @@
+from django.db import router, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
-from rest_framework import filters, viewsets, mixins
-from rest_framework.pagination import LimitOffsetPagination
-
-from posts.models import Group, Post
+from rest_framework import filters, status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from posts.models import Comment, Group, Post, User
 
+from .authentication import StatelessJWTAuthentication
+from .cache import CachedResponseMixin
+from .fast_serializers import CommentFastSerializer, PostFastSerializer
+from .feed import get_feed_strategy
+from .filters import PostFilterBackend
+from .groups import group_cache
+from .pagination import KeysetPagination, PostPagination
 from .permissions import IsOwnerOrReadOnly
-from .serializers import (CommentSerializer, FollowSerializer, GroupSerializer,
-                          PostSerializer)
+from .search import get_search_backend
+from .serializers import (BulkDeleteSerializer, CommentSerializer,
+                          FollowSerializer, GroupSerializer, PostSerializer,
+                          UserSerializer)
+
+
+class BulkCreateMixin:
+    """
+    Добавляет ViewSet действие `bulk` для пакетного создания объектов.
+
+    Принимает массив объектов и создаёт валидные одной транзакцией.
+    Ошибки возвращаются по индексам элементов; с параметром `?atomic=1`
+    любая ошибка отменяет весь пакет.
+    """
+
+    def get_bulk_create_kwargs(self):
+        return {}
+
+    def perform_bulk_create(self, objs):
+        pass
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        context = self.get_serializer_context()
+        context['atomic'] = request.query_params.get(
+            'atomic', '').lower() in ('1', 'true')
+        serializer = self.get_serializer(
+            data=request.data, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        model = serializer.child.Meta.model
+        with transaction.atomic(using=router.db_for_write(model)):
+            objs = serializer.bulk_create(**self.get_bulk_create_kwargs())
+            self.perform_bulk_create(objs)
+
+        errors = [
+            {'index': index, 'errors': item_errors}
+            for index, item_errors in enumerate(serializer.item_errors)
+            if item_errors
+        ]
+        return Response(
+            {
+                'results': self.get_serializer(objs, many=True).data,
+                'errors': errors,
+            },
+            status=(status.HTTP_201_CREATED if objs or not errors
+                    else status.HTTP_400_BAD_REQUEST),
+        )
+
+
+class FastListMixin:
+    """
+    Отдаёт список через `fast_serializer_class` из строк `values_list()`
+    без создания объектов моделей и полей сериализатора для каждого
+    объекта. Ответ совпадает с ответом `serializer_class`.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.fast_serializer_class(
+            self.get_serializer_context())
+        rows = serializer.get_queryset(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class BulkDestroyMixin:
+    """
+    Добавляет ViewSet действие `bulk-delete` для пакетного удаления.
+
+    Принимает `{"ids": [...]}` и удаляет только те объекты, которые
+    разрешения позволяют изменять: проверка выполняется фильтром в SQL
+    через `filter_queryset` классов разрешений.
+    """
+
+    def filter_queryset_by_permissions(self, queryset):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'filter_queryset'):
+                queryset = permission.filter_queryset(
+                    self.request, queryset, self)
+        return queryset
+
+    @action(detail=False, methods=('post',), url_path='bulk-delete')
+    def bulk_delete(self, request, *args, **kwargs):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
 
+        queryset = self.filter_queryset_by_permissions(
+            self.get_queryset().filter(pk__in=ids))
+        model = queryset.model
+        with transaction.atomic(using=router.db_for_write(model)):
+            _, deleted = queryset.delete()
+        return Response({'deleted': deleted.get(model._meta.label, 0)})
 
-class PostViewSet(viewsets.ModelViewSet):
+
+class PostViewSet(BulkCreateMixin, BulkDestroyMixin, CachedResponseMixin,
+                  FastListMixin, viewsets.ModelViewSet):
     """
         ViewSet для модели Post.
 
         Атрибуты:
-            queryset (QuerySet): QuerySet для получения всех постов из БД.
+            queryset (QuerySet): QuerySet для получения всех постов из БД
+                вместе с авторами и группами одним запросом (без N+1).
             serializer_class (Serializer): Сериализатор для модели Post.
-            pagination_class (Pagination): Класс пагинации для списка постов.
+            fast_serializer_class (FastReadSerializer): Быстрая
+                сериализация списка постов.
+            pagination_class (Pagination): Класс пагинации для списка постов
+                (limit/offset либо курсорная по `?cursor=`).
             permission_classes (tuple): Кортеж классов разрешений
                 для управления доступом к представлению.
+            authentication_classes (tuple): Аутентификация по токену без
+                запроса пользователя к БД при чтении.
+            filter_backends (tuple): Фильтрация по группе, автору и дате
+                публикации.
+            search_param (str): Параметр запроса полнотекстового поиска.
         """
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author', 'group')
     serializer_class = PostSerializer
-    pagination_class = LimitOffsetPagination
+    fast_serializer_class = PostFastSerializer
+    pagination_class = PostPagination
+    filter_backends = (PostFilterBackend,)
     permission_classes = (IsOwnerOrReadOnly,)
+    authentication_classes = (StatelessJWTAuthentication,)
+    search_param = 'search'
+
+    def get_queryset(self):
+        """
+        Возвращает посты, найденные по параметру `search` и упорядоченные
+        по релевантности, либо все посты.
+        """
+        queryset = super().get_queryset()
+        query = self.request.query_params.get(self.search_param)
+        if self.action == 'list' and query is not None:
+            queryset = get_search_backend().search(queryset, query)
+        return queryset
 
+    def get_cache_namespace(self):
+        """
+        Список постов и каждый пост кэшируются в своих пространствах имён.
+        """
+        if self.action == 'retrieve':
+            return f'posts:{self.kwargs[self.lookup_field]}'
+        return 'posts'
+
+    @transaction.atomic
     def perform_create(self, serializer):
         """
-        Выполняет операцию создания поста.
+        Выполняет операцию создания поста и раскладывает его по лентам
+        подписчиков в одной транзакции с изменением счётчика постов.
         """
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        get_feed_strategy().publish(post)
 
+    def get_bulk_create_kwargs(self):
+        return {'author': self.request.user}
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+    def perform_bulk_create(self, posts):
+        """
+        Раскладывает созданные пакетом посты по лентам подписчиков.
+        """
+        strategy = get_feed_strategy()
+        for post in posts:
+            strategy.publish(post)
+
+
+class GroupViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet для модели Group.
 
@@ -42,51 +193,117 @@ class GroupViewSet(viewsets.ReadOnlyModelViewSet):
         serializer_class (Serializer): Сериализатор для модели Group.
         permission_classes (tuple): Кортеж классов разрешений для управления
             доступом к представлению.
+        authentication_classes (tuple): Аутентификация по токену без
+            запроса пользователя к БД.
     """
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = (IsOwnerOrReadOnly,)
+    authentication_classes = (StatelessJWTAuthentication,)
+
+    def get_cache_namespace(self):
+        """
+        Посты сообщества кэшируются вместе со списком постов.
+        """
+        if self.action == 'posts':
+            return 'posts'
+        return 'groups'
+
+    def get_queryset(self):
+        """
+        Возвращает сообщества из кэша процесса без запроса к БД.
+        """
+        return list(group_cache.get_all().values())
+
+    def get_object(self):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        group = group_cache.get(int(lookup)) if lookup.isdecimal() else None
+        if group is None:
+            raise Http404
+        self.check_object_permissions(self.request, group)
+        return group
+
+    @action(detail=True, methods=('get',), serializer_class=PostSerializer)
+    def posts(self, request, *args, **kwargs):
+        """
+        Возвращает посты сообщества с курсорной пагинацией по индексу
+        `(group, pub_date, id)`.
+        """
+        return self.get_cached_response(
+            self.list_posts, request, *args, **kwargs)
+
+    def list_posts(self, request, *args, **kwargs):
+        group = self.get_object()
+        paginator = KeysetPagination()
+        serializer = PostFastSerializer(self.get_serializer_context())
+        rows = paginator.paginate_queryset(
+            serializer.get_queryset(Post.objects.filter(group=group)),
+            request, view=self,
+        )
+        return paginator.get_paginated_response(serializer.serialize(rows))
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(BulkCreateMixin, BulkDestroyMixin, CachedResponseMixin,
+                     FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet для модели Comment.
 
     Атрибуты:
         serializer_class (Serializer): Сериализатор для модели Comment.
+        fast_serializer_class (FastReadSerializer): Быстрая сериализация
+            списка комментариев.
         lookup_url_kwarg (str): Имя URL-параметра для поиска комментариев.
         permission_classes (tuple): Кортеж классов разрешений для управления
             доступом к представлению.
+        authentication_classes (tuple): Аутентификация по токену без
+            запроса пользователя к БД при чтении.
     """
     serializer_class = CommentSerializer
+    fast_serializer_class = CommentFastSerializer
     lookup_url_kwarg = 'comment_id'
     permission_classes = (IsOwnerOrReadOnly,)
+    authentication_classes = (StatelessJWTAuthentication,)
+
+    def get_cache_namespace(self):
+        return f'comments:{self.kwargs["post_id"]}'
 
     def get_post(self):
-        return get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+        """
+        Возвращает пост из URL, обращаясь к БД не более одного раза
+        за запрос.
+        """
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+        return self._post
 
     def get_queryset(self):
         """
         Возвращает:
-            QuerySet: Комментарии, относящиеся к определенному посту.
+            QuerySet: Комментарии, относящиеся к определенному посту,
+                вместе с авторами в порядке добавления.
         """
-        self.post = self.get_post()
-        return self.post.comments.all()
+        return Comment.objects.filter(
+            post=self.get_post(),
+        ).select_related('author').order_by('created', 'id')
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
-        Выполняет операцию создания комментария.
+        Выполняет операцию создания комментария в одной транзакции с
+        изменением счётчика комментариев поста.
         """
-        post = self.get_post()
         serializer.save(author=self.request.user,
-                        post=post, )
+                        post=self.get_post(), )
+
+    def get_bulk_create_kwargs(self):
+        return {'author': self.request.user, 'post': self.get_post()}
 
     def perform_update(self, serializer):
         """
-        Выполняет операцию обновления комментария.
+        Выполняет операцию обновления комментария. Автор не меняется,
+        поэтому пользователь из БД не загружается.
         """
-        serializer.save(author=self.request.user,
-                        post=self.post, )
+        serializer.save(post=self.get_post(), )
 
 
 class FollowViewSet(mixins.ListModelMixin, mixins.CreateModelMixin,
@@ -109,8 +326,56 @@ class FollowViewSet(mixins.ListModelMixin, mixins.CreateModelMixin,
         """
         return self.request.user.following.all()
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
-        Выполняет операцию создания подписки.
+        Выполняет операцию создания подписки и добавляет посты автора
+        в ленту подписчика в одной транзакции с изменением счётчиков.
+        """
+        follow = serializer.save(user=self.request.user)
+        get_feed_strategy().follow(follow)
+
+
+class UserViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet пользователя со счётчиками постов и подписок.
+
+    Атрибуты:
+        queryset (QuerySet): Пользователь вместе с профилем одним
+            запросом.
+        serializer_class (Serializer): Сериализатор для модели User.
+        lookup_field (str): Пользователь ищется по имени.
+        permission_classes (tuple): Кортеж классов разрешений для управления
+            доступом к представлению.
+        authentication_classes (tuple): Аутентификация по токену без
+            запроса пользователя к БД.
+    """
+    queryset = User.objects.select_related('profile')
+    serializer_class = UserSerializer
+    lookup_field = 'username'
+    permission_classes = (IsOwnerOrReadOnly,)
+    authentication_classes = (StatelessJWTAuthentication,)
+
+
+class FeedViewSet(FastListMixin, viewsets.GenericViewSet):
+    """
+    ViewSet ленты постов авторов, на которых подписан пользователь.
+
+    Атрибуты:
+        serializer_class (Serializer): Сериализатор для модели Post.
+        fast_serializer_class (FastReadSerializer): Быстрая сериализация
+            ленты.
+        pagination_class (Pagination): Класс пагинации для ленты
+            (limit/offset либо курсорная по `?cursor=`).
+    """
+    serializer_class = PostSerializer
+    fast_serializer_class = PostFastSerializer
+    pagination_class = PostPagination
+
+    def get_queryset(self):
+        """
+        Возвращает посты ленты согласно настройке `FEED_STRATEGY`.
         """
-        serializer.save(user=self.request.user)
+        return get_feed_strategy().get_queryset(
+            self.request.user,
+        ).select_related('author', 'group').order_by('-pub_date', '-id')
@@ -0,0 +1,89 @@
+"""
+Данный модуль содержит работу с денормализованными счётчиками
+`Post.comments_count` и `Profile.*_count`.
+
+Счётчики изменяются F-выражениями в той же транзакции, что и
+создание или удаление объектов, а расхождения исправляет команда
+`reconcile_counters`, пересчитывающая значения пакетами.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def adjust_counter(queryset, field, delta):
+    """
+    Атомарно изменяет счётчик объектов QuerySet на `delta`.
+
+    Строки не создаются, а счётчик не уходит ниже нуля: такие
+    расхождения исправляет `reconcile_counters`.
+    """
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def _count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        Value(0),
+    )
+
+
+def _reconcile(queryset, batch_size, **counters):
+    """
+    Пересчитывает счётчики пакетами по первичному ключу и возвращает
+    число исправленных строк.
+    """
+    fixed = 0
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return fixed
+        last_pk = pks[-1]
+
+        annotated = queryset.filter(pk__in=pks).annotate(**{
+            f'actual_{field}': expression
+            for field, expression in counters.items()
+        })
+        drifted = annotated.none()
+        for field in counters:
+            drifted = drifted | annotated.exclude(
+                **{field: F(f'actual_{field}')})
+        drifted_pks = list(drifted.values_list('pk', flat=True))
+        if drifted_pks:
+            fixed += queryset.filter(pk__in=drifted_pks).update(**counters)
+
+
+def reconcile_posts(post_model, comment_model, batch_size=1000):
+    return _reconcile(
+        post_model.objects.all(), batch_size,
+        comments_count=_count_subquery(comment_model, 'post'),
+    )
+
+
+def reconcile_profiles(user_model, profile_model, post_model, follow_model,
+                       batch_size=1000):
+    missing = user_model.objects.filter(profile__isnull=True)
+    profile_model.objects.bulk_create(
+        (profile_model(user_id=pk)
+         for pk in missing.values_list('pk', flat=True).iterator()),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    return _reconcile(
+        profile_model.objects.all(), batch_size,
+        posts_count=_count_subquery(post_model, 'author'),
+        followers_count=_count_subquery(follow_model, 'following'),
+        following_count=_count_subquery(follow_model, 'user'),
+    )
@@ -0,0 +1,26 @@
+"""
+Команда пересчёта денормализованных счётчиков постов и профилей.
+"""
+
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_posts, reconcile_profiles
+from posts.models import Comment, Follow, Post, Profile, User
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает `Post.comments_count` и счётчики `Profile` '
+            'и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число строк, пересчитываемых одним запросом.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = reconcile_posts(Post, Comment, batch_size=batch_size)
+        profiles = reconcile_profiles(User, Profile, Post, Follow,
+                                      batch_size=batch_size)
+        self.stdout.write(
+            f'Исправлено постов: {posts}, профилей: {profiles}.')
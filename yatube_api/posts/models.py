@@ -3,7 +3,9 @@
 """
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router, transaction
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -50,11 +52,32 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to=settings.IMAGE_UPLOAD_PATH,
+        storage=ContentAddressedStorage(),
         null=True,
         blank=True,
+        db_index=True,
         help_text='Изображение',
         verbose_name='Изображение',
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Число комментариев',
+        verbose_name='Число комментариев',
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Уменьшенные копии изображения',
+        verbose_name='Копии изображения',
+    )
+    fanned_out = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Пост разложен по лентам подписчиков',
+        verbose_name='Разложен по лентам',
+    )
     group = models.ForeignKey(
         Group,
         on_delete=models.CASCADE,
@@ -65,7 +88,50 @@ class Post(models.Model):
         verbose_name='Группа',
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает загруженное из БД изображение, чтобы после замены
+        освободить старый файл.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image = instance.__dict__.get('image')
+        instance._loaded_image_variants = instance.__dict__.get(
+            'image_variants')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Не перезаписывает при обновлении поста счётчик комментариев и
+        отметку раскладки по лентам: они изменяются только запросами
+        `update()` (см. `posts.counters` и `api.feed`).
+
+        Файл изображения и ссылка на него сохраняются в одной транзакции:
+        хранилище проверяет файл после её фиксации.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ('comments_count', 'fanned_out')
+            ]
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     class Meta:
+        indexes = (
+            models.Index(fields=('pub_date', 'id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', 'pub_date', 'id'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         condition=models.Q(fanned_out=False),
+                         name='post_author_not_fanned_idx'),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -87,6 +153,10 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('user', 'following', )
+        indexes = (
+            models.Index(fields=('following', 'user'),
+                         name='follow_following_user_idx'),
+        )
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
 
@@ -118,5 +188,61 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = (
+            models.Index(fields=('post', 'created'),
+                         name='comment_post_created_idx'),
+        )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        help_text='Владелец ленты',
+        verbose_name='Владелец ленты',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        help_text='Пост',
+        verbose_name='Пост',
+    )
+
+    class Meta:
+        unique_together = ('user', 'post', )
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile',
+        help_text='Пользователь',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Число постов',
+        verbose_name='Число постов',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Число подписчиков',
+        verbose_name='Число подписчиков',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Число подписок',
+        verbose_name='Число подписок',
+    )
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
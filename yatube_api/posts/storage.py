@@ -0,0 +1,106 @@
+"""
+Данный модуль содержит хранилище файлов с адресацией по содержимому.
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files import File, locks
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+# Число файлов блокировок: имена распределяются по ним по хэшу.
+LOCK_STRIPES = 256
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, в котором имя файла — SHA-256 его содержимого.
+
+    Одинаковые файлы записываются на диск один раз, а все ссылающиеся на
+    них записи хранят одно и то же имя. Удалять такой файл можно, только
+    когда на него не осталось ссылок: проверка ссылок и удаление
+    выполняются под `lock(name)`.
+
+    Ссылка на сохранённый файл появляется в БД только после фиксации
+    транзакции, а до этого удаление может счесть файл ненужным. Поэтому
+    после фиксации `_save` под той же блокировкой проверяет, что файл
+    на месте, и при необходимости записывает его заново.
+    """
+
+    @contextmanager
+    def lock(self, name):
+        """
+        Межпроцессная блокировка файла `name`.
+        """
+        stripe = int(hashlib.sha256(name.encode()).hexdigest(), 16)
+        directory = self.path('.locks')
+        os.makedirs(directory, exist_ok=True)
+        lock_path = os.path.join(directory,
+                                 f'{stripe % LOCK_STRIPES:02x}.lock')
+        with open(lock_path, 'a') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        hexdigest = digest.hexdigest()
+
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        name = os.path.join(directory, hexdigest[:2], hexdigest + extension)
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Совпадение имён означает совпадение содержимого.
+        return name
+
+    def _save(self, name, content):
+        with self.lock(name):
+            self._write(name, content)
+
+        def restore():
+            with self.lock(name):
+                self._write(name, content)
+
+        transaction.on_commit(restore)
+        return name
+
+    def _write(self, name, content):
+        """
+        Записывает файл, если его нет на диске.
+        """
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            return
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Пишем во временный файл и атомарно переименовываем, чтобы
+        # читатели не видели недописанный файл. Загруженный файл не
+        # перемещается: он может понадобиться `restore()`.
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
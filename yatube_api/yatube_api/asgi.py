@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+# Под ASGI закэшированные ответы API отдаются без перехода в пул потоков.
+os.environ.setdefault('API_ASYNC_READS', '1')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.stream import get_stream_application  # noqa: E402
+
+# Поток событий обслуживается в обход Django (см. api/stream.py).
+application = get_stream_application(django_application)
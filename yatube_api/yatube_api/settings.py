@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -59,9 +60,107 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Время жизни постоянного подключения потока в секундах;
+        # 0 — закрывать подключение после каждого запроса.
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
     }
 }
 
+# Профиль БД: 'production' включает WAL и настройки SQLite для
+# конкурентной нагрузки и отправляет чтение безопасных запросов
+# в отдельное подключение только для чтения (см. api/routers.py).
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+
+# Применяются при открытии подключения (см. api/signals.py).
+SQLITE_PRAGMAS = {}
+SQLITE_PRODUCTION_PRAGMAS = {
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+if DATABASE_PROFILE == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    # Общий для потоков пул подключений (см. api/backends/pool.py).
+    # Подключение возвращается в пул в конце каждого запроса, поэтому
+    # пул не нужно делать больше числа рабочих потоков.
+    DATABASES['default'].update({
+        'ENGINE': 'api.backends.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 0)),
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DATABASE_POOL_SIZE', 20)),
+            'MAX_LIFETIME': 60 * 60,
+            'TIMEOUT': 10,
+        },
+        'PRAGMAS': {'journal_mode': 'WAL', **SQLITE_PRAGMAS},
+    })
+
+# Файлы SQLite реплик для чтения через запятую. Копируются из основной
+# БД командой `sync_replicas`. Без реплик производственный профиль читает
+# основной файл через подключение только для чтения.
+DATABASE_REPLICA_FILES = [
+    path for path in os.environ.get('DATABASE_REPLICAS', '').split(',')
+    if path
+]
+if DATABASE_PROFILE == 'production' and not DATABASE_REPLICA_FILES:
+    DATABASE_REPLICA_FILES = [DATABASES['default']['NAME']]
+
+DATABASE_REPLICAS = []
+for number, path in enumerate(DATABASE_REPLICA_FILES, 1):
+    alias = 'reader' if number == 1 else f'reader_{number}'
+    DATABASES[alias] = {
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'NAME': f'file:{path}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'POOL': DATABASES['default'].get('POOL'),
+        'PRAGMAS': {**SQLITE_PRAGMAS, 'query_only': 'ON'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Сколько секунд после записи чтение пользователя идёт в основную БД,
+# а не в реплику. Отметки хранятся в кэше `DATABASE_STICKY_CACHE_ALIAS`,
+# который для нескольких процессов должен быть общим.
+DATABASE_STICKY_SECONDS = 5
+DATABASE_STICKY_CACHE_ALIAS = 'api-generations'
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['api.routers.ReadWriteRouter']
+    MIDDLEWARE.append('api.routers.safe_method_read_middleware')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кэш ответов API (см. api/cache.py). Можно заменить на
+    # 'django.core.cache.backends.filebased.FileBasedCache'.
+    'api': {
+        'BACKEND': 'api.cache.LRUMemoryCache',
+        'LOCATION': 'api',
+        'OPTIONS': {
+            'MAX_BYTES': 32 * 1024 * 1024,
+            'MAX_ENTRIES': 100000,
+        },
+    },
+    # Поколения кэша ответов, из которых строятся `ETag` и
+    # `Last-Modified`, и отметки записи для чтения из реплик. Кэш должен
+    # быть общим для всех процессов (файловый на одном сервере, Redis или
+    # Memcached на нескольких), иначе запись в одном процессе не видна
+    # в других.
+    'api-generations': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'api-generations',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = 300
+API_GENERATION_CACHE_ALIAS = 'api-generations'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -96,7 +195,18 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachingJWTAuthentication',
+    ],
+
+    # JSON на `orjson`, если он установлен (см. api/renderers.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -105,6 +215,56 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.TokenObtainPairSerializer',
 }
 
+# Кэш пользователей по проверенным JWT-токенам (см. api/authentication.py).
+JWT_USER_CACHE_SIZE = 10000
+JWT_USER_CACHE_MAX_TTL = 300
+
 IMAGE_UPLOAD_PATH = 'posts/'
+
+# Стратегия построения ленты подписок (см. api/feed.py).
+FEED_STRATEGY = 'api.feed.HybridStrategy'
+# Посты авторов с большим числом подписчиков не раскладываются по лентам
+# при публикации, а добираются при чтении.
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+
+# Асинхронная отдача закэшированных ответов при запуске под ASGI
+# (см. api/async_views.py); включается в yatube_api/asgi.py.
+API_ASYNC_READS = os.environ.get('API_ASYNC_READS') == '1'
+
+# Поток событий о новых постах и комментариях (см. api/stream.py).
+EVENT_STREAM_PATH = '/api/v1/stream/'
+EVENT_STREAM_QUEUE_SIZE = 100
+# 'drop_oldest' — отбрасывать старые события, 'disconnect' — отключать
+# клиента при переполнении очереди.
+EVENT_STREAM_DROP_POLICY = 'drop_oldest'
+EVENT_STREAM_MAX_SUBSCRIBERS = 10000
+EVENT_STREAM_KEEPALIVE = 15
+
+# Кэш слагов групп и имён авторов для фильтров постов (см. api/filters.py).
+POST_FILTER_CACHE_SIZE = 1000
+POST_FILTER_CACHE_TTL = 60
+
+# Время жизни кэша сообществ в памяти процесса (см. api/groups.py).
+GROUP_CACHE_TTL = 60
+
+# Движок полнотекстового поиска постов (см. api/search.py).
+POST_SEARCH_BACKEND = 'api.search.SQLiteFTS5Backend'
+
+# Ограничения пакетного создания постов и комментариев.
+BULK_CREATE_MAX_ITEMS = 1000
+BULK_CREATE_BATCH_SIZE = 500
+
+# Ограничения загружаемых изображений в формате base64.
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 25_000_000
+
+# Уменьшенные копии изображений постов (см. api/images.py).
+IMAGE_DERIVATIVE_PATH = IMAGE_UPLOAD_PATH + 'derivatives/'
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVE_FORMATS = ('webp', 'jpeg')
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_DERIVATIVE_WORKERS = 2
+IMAGE_DERIVATIVES_ASYNC = True